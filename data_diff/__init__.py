@@ -59,7 +59,8 @@ def diff_tables(
     # Enable/disable threaded diffing. Needed to take advantage of database threads.
     threaded: bool = True,
     # Maximum size of each threadpool. None = auto. Only relevant when threaded is True.
-    # There may be many pools, so number of actual threads can be a lot higher.
+    # There may be many pools (one shared, plus one per diff and per group of background queries),
+    # so number of actual threads can be a lot higher.
     max_threadpool_size: Optional[int] = 1,
     # Algorithm
     algorithm: Algorithm = Algorithm.AUTO,
@@ -98,7 +99,9 @@ def diff_tables(
         threaded (bool): Enable/disable threaded diffing. Needed to take advantage of database threads.
         max_threadpool_size (int): Maximum size of each threadpool. ``None`` means auto.
                                    Only relevant when `threaded` is ``True``.
-                                   There may be many pools, so number of actual threads can be a lot higher.
+                                   There may be many pools: one shared by the differ's short queries, plus one
+                                   per diff and per group of background queries. So the number of actual
+                                   threads can be a lot higher.
         where (str, optional): An additional 'where' expression to restrict the search space.
         algorithm (:class:`Algorithm`): Which diffing algorithm to use (`HASHDIFF` or `JOINDIFF`. Default=`AUTO`)
         bisection_factor (int): Into how many segments to bisect per iteration. (Used when algorithm is `HASHDIFF`)
@@ -153,6 +153,21 @@ click.Context.formatter_class = MyHelpFormatter
     is_flag=True,
     help=f"Automatically calculate bisection-factor based on amount of rows in the biggest table. --bisection-factor=NUM will be ignored",
 )
+@click.option(
+    "--stop-at-top-level",
+    is_flag=True,
+    help="Stop as soon as a difference is found. Useful to check whether the tables differ at all. "
+    "(hashdiff) The first differing segment is reported by its key range, instead of being bisected or downloaded. "
+    "When a difference is found, --stats can't report row counts, since the tables weren't fully counted.",
+)
+@click.option(
+    "--chunk-size",
+    default=None,
+    type=int,
+    help="(hashdiff) Don't bisect. Split the tables once into segments of about NUM rows, "
+    "and compare the differing segments locally. Overrides --bisection-factor.",
+    metavar="NUM",
+)
 @click.option(
     "-m",
     "--materialize-to-table",
@@ -392,6 +407,8 @@ def _get_table_differ(
     bisection_factor: Optional[int],
     bisection_threshold: Optional[int],
     auto_bisection_factor: Optional[bool],
+    stop_at_top_level: bool = False,
+    chunk_size: Optional[int] = None,
 ) -> TableDiffer:
     algorithm = Algorithm(algorithm)
     if algorithm == Algorithm.AUTO:
@@ -410,6 +427,7 @@ def _get_table_differ(
             materialize_to_table=(
                 materialize_to_table and db1.dialect.parse_table_name(eval_name_template(materialize_to_table))
             ),
+            stop_at_top_level=stop_at_top_level,
         )
 
     assert algorithm == Algorithm.HASHDIFF
@@ -419,6 +437,8 @@ def _get_table_differ(
         threaded=threaded,
         max_threadpool_size=threads and threads * 2,
         auto_bisection_factor=auto_bisection_factor,
+        stop_at_top_level=stop_at_top_level,
+        chunk_size=chunk_size,
     )
 
 
@@ -434,6 +454,9 @@ def _print_result(stats, json_output, diff_iter) -> None:
             color = COLOR_SCHEME.get(op, "grey62")
 
             if json_output:
+                if op == "~":
+                    # Key-range bounds are key vectors, which may hold non-JSON values (e.g. ArithUUID)
+                    values = [[str(k) for k in bound] for bound in values]
                 jsonl = json.dumps([op, list(values)])
                 rich.print(f"[{color}]{jsonl}[/{color}]")
             else:
@@ -503,6 +526,8 @@ def _data_diff(
     bisection_factor,
     bisection_threshold,
     auto_bisection_factor,
+    stop_at_top_level,
+    chunk_size,
     min_age,
     max_age,
     stats,
@@ -572,6 +597,8 @@ def _data_diff(
             materialize_to_table,
             bisection_factor,
             bisection_threshold,
+            stop_at_top_level=stop_at_top_level,
+            chunk_size=chunk_size,
         )
 
         table_names = table1, table2
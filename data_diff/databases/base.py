@@ -216,6 +216,9 @@ class BaseDialect(abc.ABC):
     SUPPORTS_PRIMARY_KEY: ClassVar[bool] = False
     SUPPORTS_INDEXES: ClassVar[bool] = False
     PREVENT_OVERFLOW_WHEN_CONCAT: ClassVar[bool] = False
+    # Dialects that set it also define fast_hash_as_int(s): SQL for a non-cryptographic hash of s, as an int.
+    # The hashes are summed, so the int must be wide enough not to overflow.
+    SUPPORTS_FAST_HASH: ClassVar[bool] = False
     TYPE_CLASSES: ClassVar[Dict[str, Type[ColType]]] = {}
     DEFAULT_NUMERIC_PRECISION: ClassVar[int] = 0  # effective precision when type is just "NUMERIC"
 
@@ -226,6 +229,8 @@ class BaseDialect(abc.ABC):
     _prevent_overflow_when_concat: bool = False
 
     def enable_preventing_type_overflow(self) -> None:
+        if self._prevent_overflow_when_concat:
+            return
         logger.info("Preventing type overflow when concatenation is enabled")
         self._prevent_overflow_when_concat = True
 
@@ -417,6 +422,8 @@ class BaseDialect(abc.ABC):
             # No need to coalesce - safe to assume that key cannot be null
             (expr,) = elem.exprs
         expr = self.compile(c, expr)
+        if elem.fast and self.SUPPORTS_FAST_HASH:
+            return f"sum({self.fast_hash_as_int(expr)})"
         md5 = self.md5_as_int(expr)
         return f"sum({md5})"
 
@@ -42,6 +42,7 @@ def import_clickhouse():
 class Dialect(BaseDialect):
     name = "Clickhouse"
     ROUNDS_ON_PREC_LOSS = False
+    SUPPORTS_FAST_HASH = True
     TYPE_CLASSES = {
         "Int8": Integer,
         "Int16": Integer,
@@ -107,6 +108,10 @@ class Dialect(BaseDialect):
             f"reinterpretAsUInt128(reverse(unhex(lowerUTF8(substr(hex(MD5({s})), {substr_idx}))))) - {CHECKSUM_OFFSET}"
         )
 
+    def fast_hash_as_int(self, s: str) -> str:
+        # Widened, because sum() of UInt64 wraps around
+        return f"toUInt128(xxHash64({s}))"
+
     def md5_as_hex(self, s: str) -> str:
         return f"hex(MD5({s}))"
 
@@ -45,6 +45,7 @@ class Dialect(BaseDialect):
     ROUNDS_ON_PREC_LOSS = False
     SUPPORTS_PRIMARY_KEY = True
     SUPPORTS_INDEXES = True
+    SUPPORTS_FAST_HASH = True
 
     # https://duckdb.org/docs/sql/data_types/numeric#fixed-point-decimals
     # The default WIDTH and SCALE is DECIMAL(18, 3), if none are specified.
@@ -104,6 +105,10 @@ class Dialect(BaseDialect):
     def md5_as_int(self, s: str) -> str:
         return f"('0x' || SUBSTRING(md5({s}), {1+MD5_HEXDIGITS-CHECKSUM_HEXDIGITS},{CHECKSUM_HEXDIGITS}))::BIGINT - {CHECKSUM_OFFSET}"
 
+    def fast_hash_as_int(self, s: str) -> str:
+        # UBIGINT, which sum() widens to HUGEINT
+        return f"hash({s})"
+
     def md5_as_hex(self, s: str) -> str:
         return f"md5({s})"
 
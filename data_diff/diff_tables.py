@@ -3,14 +3,16 @@
 import threading
 import time
 import os
+from itertools import chain, islice, repeat
 from abc import ABC, abstractmethod
 from enum import Enum
 from contextlib import contextmanager
 from operator import methodcaller
-from typing import Any, Dict, Set, List, Tuple, Iterator, Optional, Union
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, FrozenSet, List, Tuple, Iterator, Optional, Union
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 
 import attrs
+from typing_extensions import Self
 
 from data_diff.errors import DataDiffMismatchingKeyTypesError
 from data_diff.info_tree import InfoTree, SegmentInfo
@@ -18,7 +20,7 @@ from data_diff.utils import dbt_diff_string_template, run_as_daemon, safezip, ge
 from data_diff.thread_utils import ThreadedYielder
 from data_diff.table_segment import TableSegment, create_mesh_from_points
 from data_diff.tracking import create_end_event_json, create_start_event_json, send_event_json, is_tracking_enabled
-from data_diff.abcs.database_types import IKey
+from data_diff.abcs.database_types import DbKey, IKey
 
 logger = getLogger(__name__)
 
@@ -29,37 +31,73 @@ class Algorithm(Enum):
     HASHDIFF = "hashdiff"
 
 
-DiffResult = Iterator[Tuple[str, tuple]]  # Iterator[Tuple[Literal["+", "-"], tuple]]
+DiffResult = Iterator[Tuple[str, tuple]]  # Iterator[Tuple[Literal["+", "-", "~"], tuple]]
 DiffResultList = Iterator[List[Tuple[str, tuple]]]
 
 
 @attrs.define(frozen=False)
 class ThreadBase:
-    "Provides utility methods for optional threading"
+    """Provides utility methods for optional threading
+
+    The short-lived threaded calls share a single pool, which lives as long as the instance.
+    Use the instance as a context manager to shut the pool down deterministically.
+    Background tasks (see _run_in_background) get a pool of their own, as they may run for the whole diff.
+    """
 
     threaded: bool = True
     max_threadpool_size: Optional[int] = 1
 
+    # Worker threads are only started on first use
+    _task_pool: ThreadPoolExecutor = attrs.field(
+        default=attrs.Factory(lambda self: ThreadPoolExecutor(max_workers=self.max_threadpool_size), takes_self=True),
+        init=False,
+        eq=False,
+        repr=False,
+    )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._task_pool.shutdown()
+
     def _thread_map(self, func, iterable):
+        "Maps func over iterable using the shared pool. All the tasks are submitted up-front."
         if not self.threaded:
             return map(func, iterable)
 
-        with ThreadPoolExecutor(max_workers=self.max_threadpool_size) as task_pool:
-            return task_pool.map(func, iterable)
+        return self._task_pool.map(func, iterable)
 
     def _threaded_call(self, func, iterable):
         "Calls a method for each object in iterable."
-        return list(self._thread_map(methodcaller(func), iterable))
+        objs = list(iterable)
+        if not self.threaded or len(objs) < 2:
+            return [getattr(obj, func)() for obj in objs]
+
+        # Submit the bound methods directly, and make the first call on the current thread,
+        # instead of leaving it idle while it waits for the pool.
+        futures = [self._task_pool.submit(getattr(obj, func)) for obj in objs[1:]]
+        first = getattr(objs[0], func)()
+        return [first, *(f.result() for f in futures)]
 
     def _thread_as_completed(self, func, iterable):
         if not self.threaded:
             yield from map(func, iterable)
             return
 
-        with ThreadPoolExecutor(max_workers=self.max_threadpool_size) as task_pool:
-            futures = [task_pool.submit(func, item) for item in iterable]
-            for future in as_completed(futures):
-                yield future.result()
+        # Submit while iterating, but keep the number of tasks in flight bounded,
+        # so that long iterables aren't materialized (along with their results) up-front.
+        max_in_flight = 2 * (self.max_threadpool_size or min(32, (os.cpu_count() or 1) + 4))
+        pending = set()
+        for item in iterable:
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(self._task_pool.submit(func, item))
+
+        for future in as_completed(pending):
+            yield future.result()
 
     def _threaded_call_as_completed(self, func, iterable):
         "Calls a method for each object in iterable. Returned in order of completion."
@@ -67,21 +105,69 @@ class ThreadBase:
 
     @contextmanager
     def _run_in_background(self, *funcs):
+        # Not in the shared pool: these tasks would hold its workers, and starve the calls made meanwhile
         with ThreadPoolExecutor(max_workers=self.max_threadpool_size) as task_pool:
             futures = [task_pool.submit(f) for f in funcs if f is not None]
             yield futures
-            for f in futures:
-                f.result()
+        for f in futures:
+            f.result()
 
 
 @attrs.define(frozen=True)
 class DiffStats:
     diff_by_sign: Dict[str, int]
-    table1_count: int
-    table2_count: int
-    unchanged: int
-    diff_percent: float
+    # None when the diff stopped at the first difference (see TableDiffer.stop_at_top_level)
+    table1_count: Optional[int]
+    table2_count: Optional[int]
+    # None when some differing key ranges weren't compared row by row (see TableDiffer.boundaries_only)
+    unchanged: Optional[int]
+    diff_percent: Optional[float]
     extra_column_diffs: Optional[Dict[str, int]]
+    diff_ranges: int = 0
+
+
+@attrs.define(frozen=False)
+class ColumnarDiffList:
+    """Stores diff results column-wise, instead of as a list of (sign, row) tuples.
+
+    Rows are kept as one list per column, plus a byte per row for the sign.
+    Items that aren't rows of the common width (e.g. key-range markers, or lists when using yield_list)
+    are stored as-is, along with their position.
+
+    Iterating yields the items in their original order, as (sign, row) tuples.
+    """
+
+    signs: bytearray = attrs.field(factory=bytearray)
+    columns: List[list] = attrs.field(factory=list)
+    others: List[Tuple[int, Any]] = attrs.field(factory=list)
+
+    def __len__(self) -> int:
+        return len(self.signs) + len(self.others)
+
+    def append(self, item) -> None:
+        if isinstance(item, tuple) and len(item) == 2 and item[0] in ("+", "-") and isinstance(item[1], tuple):
+            sign, values = item
+            if not self.signs and values and not self.columns:
+                self.columns = [[] for _ in values]
+            if values and len(values) == len(self.columns):
+                self.signs.append(ord(sign))
+                for column, value in zip(self.columns, values):
+                    column.append(value)
+                return
+
+        self.others.append((len(self), item))
+
+    def __iter__(self) -> Iterator[Any]:
+        rows = zip(self.signs, zip(*self.columns))
+        pos = 0
+        for other_pos, item in self.others:
+            for sign, row in islice(rows, other_pos - pos):
+                yield chr(sign), row
+            yield item
+            pos = other_pos + 1
+
+        for sign, row in rows:
+            yield chr(sign), row
 
 
 @attrs.define(frozen=True)
@@ -89,15 +175,57 @@ class DiffResultWrapper:
     diff: iter  # DiffResult
     info_tree: InfoTree
     stats: dict
-    result_list: list = attrs.field(factory=list)
+    result_list: ColumnarDiffList = attrs.field(factory=ColumnarDiffList)
+    # If set, finding a difference cancels the rest of the diff, so info_tree is only partially counted
+    stop_at_top_level: bool = False
+    # Stats are final once the diff is consumed or closed, so from then on they're computed once per is_dbt value
+    _stats_cache: Dict[bool, DiffStats] = attrs.field(factory=dict, init=False, repr=False, eq=False)
+    # Set (bypassing frozen) when the diff is consumed to the end, or closed before that
+    _exhausted: bool = attrs.field(default=False, init=False, repr=False, eq=False)
+    _closed_early: bool = attrs.field(default=False, init=False, repr=False, eq=False)
 
     def __iter__(self) -> Iterator[Any]:
         yield from self.result_list
         for i in self.diff:
             self.result_list.append(i)
             yield i
+        object.__setattr__(self, "_exhausted", True)
+
+    def close(self) -> None:
+        """Stop diffing, and cancel the queries that haven't started yet.
+
+        Iterating afterwards only yields the differences that were already found,
+        and the stats no longer include the row counts.
+        """
+        if not self._exhausted:
+            object.__setattr__(self, "_closed_early", True)
+            self._stats_cache.clear()
+        close = getattr(self.diff, "close", None)
+        if close is not None:
+            close()
+
+    def any_diff(self) -> bool:
+        """Returns whether the tables differ, diffing no more of them than it takes to tell.
+
+        If a difference is found, the rest of the diff is cancelled (see close()).
+        """
+        if self.result_list:
+            self.close()
+            return True
+        for _ in self:
+            self.close()
+            return True
+        return False
 
     def _get_stats(self, is_dbt: bool = False) -> DiffStats:
+        diff_stats = self._stats_cache.get(is_dbt)
+        if diff_stats is None:
+            diff_stats = self._compute_stats(is_dbt)
+            if self._exhausted or self._closed_early:
+                self._stats_cache[is_dbt] = diff_stats
+        return diff_stats
+
+    def _compute_stats(self, is_dbt: bool) -> DiffStats:
         list(self)  # Consume the iterator into result_list, if we haven't already
 
         key_columns = self.info_tree.info.tables[0].key_columns
@@ -109,39 +237,66 @@ class DiffResultWrapper:
             extra_columns = self.info_tree.info.tables[0].extra_columns
             extra_column_diffs = {k: 0 for k in extra_columns}
 
-        for sign, values in self.result_list:
-            k = values[:len_key_columns]
-            if is_dbt:
-                extra_column_values = values[len_key_columns:]
-            if k in diff_by_key:
-                assert sign != diff_by_key[k]
-                diff_by_key[k] = "!"
-                if is_dbt:
-                    for i in range(0, len(extra_columns)):
-                        if extra_column_values[i] != extra_column_values_store[k][i]:
-                            extra_column_diffs[extra_columns[i]] += 1
-            else:
+        # Count the signs per key in a single pass: a key seen on both sides becomes "!"
+        # Works on the columns directly, so rows don't need to be rebuilt and sliced.
+        diff_by_sign = {k: 0 for k in "+-!"}
+        # Key-range markers (see TableDiffer.boundaries_only) aren't rows
+        diff_ranges = sum(1 for _pos, item in self.result_list.others if item[0] == "~")
+
+        columns = self.result_list.columns
+        keys = zip(*columns[:len_key_columns])
+        if is_dbt and len(columns) > len_key_columns:
+            all_extra_column_values = zip(*columns[len_key_columns:])
+        else:
+            all_extra_column_values = repeat(())
+        rows = zip(map(chr, self.result_list.signs), keys, all_extra_column_values)
+        # Rows that didn't fit the columnar layout (e.g. lists, or of another width) were stored as-is
+        other_rows = (
+            (sign, tuple(values[:len_key_columns]), tuple(values[len_key_columns:]) if is_dbt else ())
+            for _pos, (sign, values) in self.result_list.others
+            if sign in ("+", "-")
+        )
+        for sign, k, extra_column_values in chain(rows, other_rows):
+            prev_sign = diff_by_key.get(k)
+            if prev_sign is None:
                 diff_by_key[k] = sign
+                diff_by_sign[sign] += 1
                 if is_dbt:
                     extra_column_values_store[k] = extra_column_values
+                continue
 
-        diff_by_sign = {k: 0 for k in "+-!"}
-        for sign in diff_by_key.values():
-            diff_by_sign[sign] += 1
-
-        table1_count = self.info_tree.info.rowcounts[1]
-        table2_count = self.info_tree.info.rowcounts[2]
-        unchanged = table1_count - diff_by_sign["-"] - diff_by_sign["!"]
-        diff_percent = 1 - unchanged / max(table1_count, table2_count)
+            assert sign != prev_sign
+            if prev_sign != "!":
+                diff_by_key[k] = "!"
+                diff_by_sign[prev_sign] -= 1
+                diff_by_sign["!"] += 1
+            if is_dbt:
+                stored_values = extra_column_values_store[k]
+                for i in range(len(extra_columns)):
+                    if extra_column_values[i] != stored_values[i]:
+                        extra_column_diffs[extra_columns[i]] += 1
+
+        if self._closed_early or (self.stop_at_top_level and self.result_list):
+            # The diff was cut short, so the tables weren't fully counted
+            table1_count = table2_count = unchanged = diff_percent = None
+        else:
+            table1_count, table2_count = self.info_tree.info.rowcounts
+            if diff_ranges:
+                # The rows of a differing key range may or may not have changed; we never compared them
+                unchanged = diff_percent = None
+            else:
+                unchanged = table1_count - diff_by_sign["-"] - diff_by_sign["!"]
+                diff_percent = 1 - unchanged / max(table1_count, table2_count)
 
-        return DiffStats(diff_by_sign, table1_count, table2_count, unchanged, diff_percent, extra_column_diffs)
+        return DiffStats(
+            diff_by_sign, table1_count, table2_count, unchanged, diff_percent, extra_column_diffs, diff_ranges
+        )
 
     def get_stats_string(self, is_dbt: bool = False):
         diff_stats = self._get_stats(is_dbt)
 
-        total_rows_diff = diff_stats.table2_count - diff_stats.table1_count
-
         if is_dbt:
+            total_rows_diff = diff_stats.table2_count - diff_stats.table1_count
             string_output = dbt_diff_string_template(
                 total_rows_table1=diff_stats.table1_count,
                 total_rows_table2=diff_stats.table2_count,
@@ -156,13 +311,19 @@ class DiffResultWrapper:
 
         else:
             string_output = ""
-            string_output += f"{diff_stats.table1_count} rows in table A\n"
-            string_output += f"{diff_stats.table2_count} rows in table B\n"
+            if diff_stats.table1_count is None:
+                string_output += "Stopped at the first difference; the tables weren't fully counted\n"
+            else:
+                string_output += f"{diff_stats.table1_count} rows in table A\n"
+                string_output += f"{diff_stats.table2_count} rows in table B\n"
             string_output += f"{diff_stats.diff_by_sign['-']} rows exclusive to table A (not present in B)\n"
             string_output += f"{diff_stats.diff_by_sign['+']} rows exclusive to table B (not present in A)\n"
             string_output += f"{diff_stats.diff_by_sign['!']} rows updated\n"
-            string_output += f"{diff_stats.unchanged} rows unchanged\n"
-            string_output += f"{100 * diff_stats.diff_percent:.2f}% difference score\n"
+            if diff_stats.unchanged is not None:
+                string_output += f"{diff_stats.unchanged} rows unchanged\n"
+                string_output += f"{100 * diff_stats.diff_percent:.2f}% difference score\n"
+            if diff_stats.diff_ranges:
+                string_output += f"{diff_stats.diff_ranges} key ranges differ (rows not downloaded)\n"
 
             if self.stats:
                 string_output += "\nExtra-Info:\n"
@@ -183,6 +344,8 @@ class DiffResultWrapper:
             "total": sum(diff_stats.diff_by_sign.values()),
             "stats": self.stats,
         }
+        if diff_stats.diff_ranges:
+            json_output["ranges"] = diff_stats.diff_ranges
         json_output["values"] = diff_stats.extra_column_diffs or {}
         return json_output
 
@@ -196,10 +359,15 @@ class TableDiffer(ThreadBase, ABC):
     segment_rows: int = attrs.field(factory=lambda: int(os.environ.get("DEFAULT_SEGMENT_ROWS", 50000)))
     stats: dict = {}
 
-    ignored_columns1: Set[str] = attrs.field(factory=set)
-    ignored_columns2: Set[str] = attrs.field(factory=set)
+    # Replaced as a whole (never mutated), so that readers can take a cheap snapshot
+    ignored_columns1: FrozenSet[str] = attrs.field(factory=frozenset, converter=frozenset)
+    ignored_columns2: FrozenSet[str] = attrs.field(factory=frozenset, converter=frozenset)
     _ignored_columns_lock: threading.Lock = attrs.field(factory=threading.Lock, init=False)
     yield_list: bool = False
+    # Yield ('~', (min_key, max_key)) for each differing leaf segment, instead of downloading its rows
+    boundaries_only: bool = False
+    # Stop as soon as the first difference is found
+    stop_at_top_level: bool = False
 
     def calculate_bisection_factor(self, rows):
         """Calculate biscetion factor based on row count
@@ -230,20 +398,27 @@ class TableDiffer(ThreadBase, ABC):
         if info_tree is None:
             segment_info = self.INFO_TREE_CLASS.SEGMENT_INFO_CLASS([table1, table2])
             info_tree = self.INFO_TREE_CLASS(segment_info)
-        return DiffResultWrapper(self._diff_tables_wrapper(table1, table2, info_tree), info_tree, self.stats)
+        return DiffResultWrapper(
+            self._diff_tables_wrapper(table1, table2, info_tree),
+            info_tree,
+            self.stats,
+            stop_at_top_level=self.stop_at_top_level,
+        )
 
     def _diff_tables_wrapper(self, table1: TableSegment, table2: TableSegment, info_tree: InfoTree) -> DiffResult:
         if is_tracking_enabled():
-            options = attrs.asdict(self, recurse=False)
-            # not a useful event attribute
-            options.pop("_ignored_columns_lock")
+            # private attributes (locks, pools, caches) are not useful event attributes
+            options = attrs.asdict(self, recurse=False, filter=lambda attr, _value: not attr.name.startswith("_"))
             options["differ_name"] = type(self).__name__
             event_json = create_start_event_json(options)
             run_as_daemon(send_event_json, event_json)
 
-        if table1.database.dialect.PREVENT_OVERFLOW_WHEN_CONCAT or table2.database.dialect.PREVENT_OVERFLOW_WHEN_CONCAT:
-            table1.database.dialect.enable_preventing_type_overflow()
-            table2.database.dialect.enable_preventing_type_overflow()
+        # Both sides must concatenate the same way, or their checksums will never match
+        dialect1, dialect2 = table1.database.dialect, table2.database.dialect
+        if dialect1.PREVENT_OVERFLOW_WHEN_CONCAT or dialect2.PREVENT_OVERFLOW_WHEN_CONCAT:
+            dialect1.enable_preventing_type_overflow()
+            if dialect2 is not dialect1:
+                dialect2.enable_preventing_type_overflow()
 
         start = time.monotonic()
         error = None
@@ -252,8 +427,18 @@ class TableDiffer(ThreadBase, ABC):
             table1, table2 = self._threaded_call("with_schema", [table1, table2])
             self._validate_and_adjust_columns(table1, table2)
 
-            yield from self._diff_tables_root(table1, table2, info_tree)
-
+            diff = iter(self._diff_tables_root(table1, table2, info_tree))
+            try:
+                yield from islice(diff, 1) if self.stop_at_top_level else diff
+            finally:
+                # If we stopped early, closing the iterator cancels the remaining work (see ThreadedYielder)
+                close = getattr(diff, "close", None)
+                if close is not None:
+                    close()
+
+        except GeneratorExit:
+            # Closed by the consumer (see DiffResultWrapper.close), not an error
+            raise
         except BaseException as e:  # Catch KeyboardInterrupt too
             error = e
         finally:
@@ -262,8 +447,8 @@ class TableDiffer(ThreadBase, ABC):
             if is_tracking_enabled():
                 runtime = time.monotonic() - start
                 rowcounts = info_tree.info.rowcounts
-                table1_count = rowcounts[1] if rowcounts else None
-                table2_count = rowcounts[2] if rowcounts else None
+                table1_count = rowcounts[0] if rowcounts else None
+                table2_count = rowcounts[1] if rowcounts else None
                 diff_count = info_tree.info.diff_count
                 err_message = truncate_error(repr(error))
                 event_json = create_end_event_json(
@@ -335,11 +520,39 @@ class TableDiffer(ThreadBase, ABC):
             f"size: table1 <= {btable1.approximate_size()}, table2 <= {btable2.approximate_size()}"
         )
 
-        ti = ThreadedYielder(self.max_threadpool_size, self.yield_list)
+        ti = ThreadedYielder(self.max_threadpool_size, self.yield_list, stop_on_first=self.stop_at_top_level)
         # Bisect (split) the table into segments, and diff them recursively.
         ti.submit(self._bisect_and_diff_segments, ti, btable1, btable2, info_tree, priority=999)
 
         # Now we check for the second min-max, to diff the portions we "missed".
+        # It's done in the background, so the results of the first pass don't wait for the second query.
+        ti.submit(
+            self._diff_missed_regions,
+            ti,
+            table1,
+            table2,
+            info_tree,
+            key_types1,
+            key_types2,
+            (min_key1, max_key1),
+            key_ranges,
+            priority=999,
+        )
+
+        return ti
+
+    def _diff_missed_regions(
+        self,
+        ti: ThreadedYielder,
+        table1: TableSegment,
+        table2: TableSegment,
+        info_tree: InfoTree,
+        key_types1: List[IKey],
+        key_types2: List[IKey],
+        first_key_range: Tuple[Vector, Vector],
+        key_ranges: Iterator[Tuple[tuple, tuple]],
+    ):
+        # Diff the portions that the first key-range "missed".
         # This is achieved by subtracting the table ranges, and dividing the resulting space into aligned boxes.
         # For example, given tables A & B, and a 2D compound key, where A was queried first for key-range,
         # the regions of B we need to diff in this second pass are marked by B1..8:
@@ -353,6 +566,7 @@ class TableDiffer(ThreadBase, ABC):
         # Overall, the max number of new regions in this 2nd pass is 3^|k| - 1
 
         # Note: python types can be the same, but the rendering parameters (e.g. casing) can differ.
+        min_key1, max_key1 = first_key_range
         min_key2, max_key2 = self._parse_key_range_result(key_types2, next(key_ranges))
 
         points = [list(sorted(p)) for p in safezip(min_key1, min_key2, max_key1, max_key2)]
@@ -360,20 +574,23 @@ class TableDiffer(ThreadBase, ABC):
 
         new_regions = [(p1, p2) for p1, p2 in box_mesh if p1 < p2 and not (p1 >= min_key1 and p2 <= max_key1)]
 
+        # All the regions are dispatched from this single task, which already runs in the background,
+        # so the (up to 3^|k| - 1) submissions don't hold up the first pass.
         for p1, p2 in new_regions:
             extra_table1 = table1.new_key_bounds(min_key=p1, max_key=p2, key_types=key_types1)
             extra_table2 = table2.new_key_bounds(min_key=p1, max_key=p2, key_types=key_types2)
             ti.submit(self._bisect_and_diff_segments, ti, extra_table1, extra_table2, info_tree, priority=999)
 
-        return ti
-
     def _parse_key_range_result(self, key_types, key_range) -> Tuple[Vector, Vector]:
         min_key_values, max_key_values = key_range
 
+        # Resolve the converters once, for both bounds
+        make_values = [key_type.make_value for key_type in key_types]
+
         # We add 1 because our ranges are exclusive of the end (like in Python)
         try:
-            min_key = Vector(key_type.make_value(mn) for key_type, mn in safezip(key_types, min_key_values))
-            max_key = Vector(key_type.make_value(mx) + 1 for key_type, mx in safezip(key_types, max_key_values))
+            min_key = Vector(make_value(mn) for make_value, mn in safezip(make_values, min_key_values))
+            max_key = Vector(make_value(mx) + 1 for make_value, mx in safezip(make_values, max_key_values))
         except (TypeError, ValueError) as e:
             raise type(e)(f"Cannot apply {key_types} to '{min_key_values}', '{max_key_values}'.") from e
 
@@ -390,32 +607,68 @@ class TableDiffer(ThreadBase, ABC):
     ):
         assert table1.is_bounded and table2.is_bounded
 
-        # Choose evenly spaced checkpoints (according to min_key and max_key)
-        biggest_table = max(table1, table2, key=methodcaller("count"))
+        if ti.stop_event.is_set():
+            return
+
         logger.info(f"Diff segments level: {level}")
+        bisection_factor = self.bisection_factor
         if self.auto_bisection_factor:
-            self.bisection_factor = self.calculate_bisection_factor(biggest_table.count())
+            # Below the top level, the segments were already counted by _diff_segments, so this is cached
+            count1, count2 = self._threaded_call("count", [table1, table2])
+            bisection_factor = self.bisection_factor = self.calculate_bisection_factor(max(count1, count2))
             logger.info(
-                f"Automatically setting bisection_factor, max_rows: {max_rows}, self.bisection_factor: {self.bisection_factor}"
+                f"Automatically setting bisection_factor, max_rows: {max_rows}, self.bisection_factor: {bisection_factor}"
             )
-        checkpoints = biggest_table.choose_checkpoints(self.bisection_factor - 1)
+
+        # Choose evenly spaced checkpoints (according to min_key and max_key).
+        # Both segments have the same key bounds, so there's no need to count them to pick one.
+        checkpoints = table1.choose_checkpoints(bisection_factor - 1)
+        self._segment_and_diff(ti, table1, table2, info_tree, checkpoints, level, max_rows)
+
+    def _segment_and_diff(
+        self,
+        ti: ThreadedYielder,
+        table1: TableSegment,
+        table2: TableSegment,
+        info_tree: InfoTree,
+        checkpoints: List[List[DbKey]],
+        level: int,
+        max_rows: Optional[int],
+    ):
+        if ti.stop_event.is_set():
+            return
 
         # Get it thread-safe, to avoid segment misalignment because of bad timing.
         with self._ignored_columns_lock:
-            table1 = attrs.evolve(table1, ignored_columns=frozenset(self.ignored_columns1))
-            table2 = attrs.evolve(table2, ignored_columns=frozenset(self.ignored_columns2))
+            ignored_columns1, ignored_columns2 = self.ignored_columns1, self.ignored_columns2
+        table1 = table1.new(ignored_columns=ignored_columns1)
+        table2 = table2.new(ignored_columns=ignored_columns2)
 
         # Create new instances of TableSegment between each checkpoint
         segmented1 = table1.segment_by_checkpoints(checkpoints)
         segmented2 = table2.segment_by_checkpoints(checkpoints)
+        self._prepare_segments(table1, table2, info_tree, segmented1, segmented2)
 
-        # Recursively compare each pair of corresponding segments between table1 and table2
+        # Recursively compare each pair of corresponding segments between table1 and table2.
+        # Higher priority runs first (see ThreadedYielder), so deeper segments go before shallower ones.
+        # This is deliberate: going depth-first streams the first rows out early and keeps the queue short.
+        # (With stop_at_top_level, nothing is queued below the first level anyway.)
         for i, (t1, t2) in enumerate(safezip(segmented1, segmented2)):
             info_node = info_tree.add_node(t1, t2, max_rows=max_rows)
             ti.submit(
                 self._diff_segments, ti, t1, t2, info_node, max_rows, level + 1, i + 1, len(segmented1), priority=level
             )
 
+    def _prepare_segments(
+        self,
+        table1: TableSegment,
+        table2: TableSegment,
+        info_tree: InfoTree,
+        segmented1: List[TableSegment],
+        segmented2: List[TableSegment],
+    ) -> None:
+        "Called with the new segments of table1 and table2, before they are queued for diffing."
+
     def ignore_column(self, column_name1: str, column_name2: str) -> None:
         """
         Ignore the column (by name on sides A & B) in md5s & diffs from now on.
@@ -434,5 +687,5 @@ class TableDiffer(ThreadBase, ABC):
         that one column might easily hit the limit and stop the whole diff.
         """
         with self._ignored_columns_lock:
-            self.ignored_columns1.add(column_name1)
-            self.ignored_columns2.add(column_name2)
+            self.ignored_columns1 = self.ignored_columns1 | {column_name1}
+            self.ignored_columns2 = self.ignored_columns2 | {column_name2}
@@ -2,12 +2,15 @@ import os
 from numbers import Number
 import logging
 from collections import defaultdict
-from typing import Any, Collection, Dict, Iterator, List, Sequence, Set, Tuple
+from functools import partial
+from itertools import filterfalse
+from operator import itemgetter
+from typing import Any, Callable, Collection, Dict, Iterator, List, Optional, Sequence, Set, Tuple
 
 import attrs
 from typing_extensions import Literal
 
-from data_diff.abcs.database_types import ColType_UUID, NumericType, PrecisionType, StringType, Boolean, JSON
+from data_diff.abcs.database_types import ColType_UUID, NumericType, PrecisionType, StringType, Boolean
 from data_diff.info_tree import InfoTree
 from data_diff.utils import safezip, diffs_are_equiv_jsons
 from data_diff.thread_utils import ThreadedYielder
@@ -27,6 +30,16 @@ _PK = Sequence[Any]
 _Row = Tuple[Any]
 
 
+def _tuple_getter(indices: Sequence[int]) -> Callable[[_Row], _Row]:
+    "Returns a function that picks the values at the given indices of a row, as a tuple"
+    if not indices:
+        return lambda row: ()
+    if len(indices) == 1:
+        (index,) = indices
+        return lambda row: (row[index],)
+    return itemgetter(*indices)
+
+
 def diff_sets(
     a: Sequence[_Row],
     b: Sequence[_Row],
@@ -39,37 +52,44 @@ def diff_sets(
     ignored_columns1: Collection[str],
     ignored_columns2: Collection[str],
 ) -> Iterator:
+    # Resolve the columns to row indices once, instead of zipping every row against the column names
+    get_pk1 = _tuple_getter(range(len(key_columns1)))
+    get_pk2 = _tuple_getter(range(len(key_columns2)))
+    cut_row1 = _tuple_getter([i for i, col in enumerate(columns1) if col not in ignored_columns1])
+    cut_row2 = _tuple_getter([i for i, col in enumerate(columns2) if col not in ignored_columns2])
+
+    # Fast path for the common case of mostly-equal segments: when the PKs are unique on both sides,
+    # rows that appear identically on both sides can't be part of any diff. Drop them with set operations
+    # (all in C), and only group the remaining rows by PK.
+    if len(set(map(get_pk1, a))) == len(a) and len(set(map(get_pk2, b))) == len(b):
+        rows1, rows2 = set(a), set(b)
+        a = list(filterfalse(rows2.__contains__, a))
+        b = list(filterfalse(rows1.__contains__, b))
+
     # Group full rows by PKs on each side. The first items are the PK: TableSegment.relevant_columns
     rows_by_pks1: Dict[_PK, List[_Row]] = defaultdict(list)
     rows_by_pks2: Dict[_PK, List[_Row]] = defaultdict(list)
     for row in a:
-        pk: _PK = tuple(val for col, val in zip(key_columns1, row))
-        rows_by_pks1[pk].append(row)
+        rows_by_pks1[get_pk1(row)].append(row)
     for row in b:
-        pk: _PK = tuple(val for col, val in zip(key_columns2, row))
-        rows_by_pks2[pk].append(row)
+        rows_by_pks2[get_pk2(row)].append(row)
 
     # Mind that the same pk MUST go in full with all the -/+ rows all at once, for grouping.
-    diffs_by_pks: Dict[_PK, List[Tuple[_Op, _Row]]] = defaultdict(list)
-    for pk in sorted(set(rows_by_pks1) | set(rows_by_pks2)):
-        cutrows1: List[_Row] = [
-            tuple(val for col, val in zip(columns1, row1) if col not in ignored_columns1) for row1 in rows_by_pks1[pk]
-        ]
-        cutrows2: List[_Row] = [
-            tuple(val for col, val in zip(columns2, row2) if col not in ignored_columns2) for row2 in rows_by_pks2[pk]
-        ]
+    # Single hash pass over the pks: first the ones of side A (probing side B), then those exclusive to side B.
+    diffs_by_pks: Dict[_PK, List[Tuple[_Op, _Row]]] = {}
+    for pk, rows1 in rows_by_pks1.items():
+        rows2 = rows_by_pks2.pop(pk, [])
 
         # Either side has 0 rows: a clearly exclusive row.
         # Either side has 2+ rows: duplicates on either side, yield it all regardless of values.
         # Both sides == 1: non-duplicate, non-exclusive, so check for values of interest.
-        if len(cutrows1) != 1 or len(cutrows2) != 1 or cutrows1 != cutrows2:
-            for row1 in rows_by_pks1[pk]:
-                diffs_by_pks[pk].append(("-", row1))
-            for row2 in rows_by_pks2[pk]:
-                diffs_by_pks[pk].append(("+", row2))
+        if len(rows1) != 1 or len(rows2) != 1 or cut_row1(rows1[0]) != cut_row2(rows2[0]):
+            diffs_by_pks[pk] = [("-", row1) for row1 in rows1] + [("+", row2) for row2 in rows2]
+    for pk, rows2 in rows_by_pks2.items():
+        diffs_by_pks[pk] = [("+", row2) for row2 in rows2]
 
     warned_diff_cols = set()
-    for diffs in (diffs_by_pks[pk] for pk in sorted(diffs_by_pks)):
+    for diffs in diffs_by_pks.values():
         if json_cols:
             parsed_match, overriden_diff_cols = diffs_are_equiv_jsons(diffs, json_cols)
             if parsed_match:
@@ -96,16 +116,43 @@ class HashDiffer(TableDiffer):
     Parameters:
         bisection_factor (int): Into how many segments to bisect per iteration.
         bisection_threshold (Number): When should we stop bisecting and compare locally (in row count).
+        skip_checksum_on_count_mismatch (bool): When the row counts of two segments differ, count the rows of
+                                                their sub-segments before checksumming them. Sub-segments whose
+                                                counts differ can't match, so their checksum query is skipped
+                                                and they are bisected right away.
+        enable_prefetch (bool): When sub-segments are counted (see `skip_checksum_on_count_mismatch`), count them
+                                in the background, instead of waiting for the counts before queueing them.
+        stop_at_top_level (bool): Stop as soon as a difference is found. A differing segment is reported by its
+                                  key-range (see `boundaries_only`), without bisecting it any further
+                                  or downloading its rows.
+        boundaries_only (bool): Yield only the key-range of each differing segment below the threshold,
+                                as ``('~', (min_key, max_key))``, instead of downloading and comparing its rows.
+        batch_checksums (bool): Count and checksum all the segments of a level in one query per table (grouped by
+                                segment), instead of one query per segment. Fewer round-trips, but less parallelism.
+                                Requires the database to support ``GROUP BY`` by column position.
+        chunk_size (int): Skip bisection, and split the tables once into segments of about `chunk_size` rows.
+                          Segments that differ are downloaded and compared locally. ``None`` means bisect.
+        fast_checksum (bool): Checksum with a non-cryptographic hash (e.g. xxHash64) instead of MD5, when both
+                              tables are in databases of the same dialect and it supports one. Otherwise, uses MD5.
+                              Off by default, because some of these hashes (e.g. DuckDB's ``hash()``) may change
+                              between database versions.
         threaded (bool): Enable/disable threaded diffing. Needed to take advantage of database threads.
         max_threadpool_size (int): Maximum size of each threadpool. ``None`` means auto.
                                    Only relevant when `threaded` is ``True``.
-                                   There may be many pools, so number of actual threads can be a lot higher.
+                                   There may be many pools: one shared by the differ's short queries, plus one
+                                   per diff and per group of background queries. So the number of actual
+                                   threads can be a lot higher.
     """
 
     bisection_factor: int = DEFAULT_BISECTION_FACTOR
     bisection_threshold: int = DEFAULT_BISECTION_THRESHOLD
     bisection_disabled: bool = False  # i.e. always download the rows (used in tests)
     auto_bisection_factor: bool = False
+    skip_checksum_on_count_mismatch: bool = True
+    enable_prefetch: bool = False
+    batch_checksums: bool = False
+    chunk_size: Optional[int] = None
+    fast_checksum: bool = False
 
     stats: dict = attrs.field(factory=dict)
 
@@ -115,6 +162,8 @@ class HashDiffer(TableDiffer):
             raise ValueError("Incorrect param values (bisection factor must be lower than threshold)")
         if self.bisection_factor < 2:
             raise ValueError("Must have at least two segments per iteration (i.e. bisection_factor >= 2)")
+        if self.chunk_size is not None and self.chunk_size < 1:
+            raise ValueError("Incorrect param values (chunk size must be at least 1)")
 
     def _validate_and_adjust_columns(self, table1: TableSegment, table2: TableSegment, *, strict: bool = True) -> None:
         for c1, c2 in safezip(table1.relevant_columns, table2.relevant_columns):
@@ -123,9 +172,17 @@ class HashDiffer(TableDiffer):
             if c2 not in table2._schema:
                 raise ValueError(f"Column '{c2}' not found in schema for table {table2}")
 
-            # Update schemas to minimal mutual precision
             col1 = table1._schema[c1]
             col2 = table2._schema[c2]
+            # Warn before adjusting, because the adjustments may skip to the next column
+            for t, c, ctype in ((table1, c1, col1), (table2, c2, col2)):
+                if not ctype.supported:
+                    logger.warning(
+                        f"[{t.database.name}] Column '{c}' of type '{ctype}' has no compatibility handling. "
+                        "If encoding/formatting differs between databases, it may result in false positives."
+                    )
+
+            # Update schemas to minimal mutual precision
             if isinstance(col1, PrecisionType):
                 if not isinstance(col2, PrecisionType):
                     if strict:
@@ -138,8 +195,10 @@ class HashDiffer(TableDiffer):
                 if col1.precision != col2.precision:
                     logger.warning(f"Using reduced precision {lowest} for column '{c1}'. Types={col1}, {col2}")
 
-                table1._schema[c1] = attrs.evolve(col1, precision=lowest.precision, rounds=lowest.rounds)
-                table2._schema[c2] = attrs.evolve(col2, precision=lowest.precision, rounds=lowest.rounds)
+                if (col1.precision, col1.rounds) != (lowest.precision, lowest.rounds):
+                    table1._schema[c1] = attrs.evolve(col1, precision=lowest.precision, rounds=lowest.rounds)
+                if (col2.precision, col2.rounds) != (lowest.precision, lowest.rounds):
+                    table2._schema[c2] = attrs.evolve(col2, precision=lowest.precision, rounds=lowest.rounds)
 
             elif isinstance(col1, (NumericType, Boolean)):
                 if not isinstance(col2, (NumericType, Boolean)):
@@ -158,14 +217,15 @@ class HashDiffer(TableDiffer):
                 if lowest.precision != col2.precision:
                     table2._schema[c2] = attrs.evolve(col2, precision=lowest.precision)
 
-        for t in [table1, table2]:
-            for c in t.relevant_columns:
-                ctype = t._schema[c]
-                if not ctype.supported:
-                    logger.warning(
-                        f"[{t.database.name}] Column '{c}' of type '{ctype}' has no compatibility handling. "
-                        "If encoding/formatting differs between databases, it may result in false positives."
-                    )
+    def _diff_tables_root(self, table1: TableSegment, table2: TableSegment, info_tree: InfoTree):
+        if self.fast_checksum:
+            # The checksums are compared with each other, so both sides must use the same hash
+            dialect1, dialect2 = table1.database.dialect, table2.database.dialect
+            if type(dialect1) is type(dialect2) and dialect1.SUPPORTS_FAST_HASH:
+                table1, table2 = table1.new(fast_checksum=True), table2.new(fast_checksum=True)
+        # Find the JSON columns once. The segments made from table1 with new() or new_key_bounds() keep them.
+        table1 = table1.with_json_columns()
+        return super()._diff_tables_root(table1, table2, info_tree)
 
     def _diff_segments(
         self,
@@ -178,10 +238,15 @@ class HashDiffer(TableDiffer):
         segment_index=None,
         segment_count=None,
     ):
+        # Lazy %-formatting: the key vectors are only stringified when INFO logging is enabled.
         logger.info(
-            ". " * level + f"Diffing segment {segment_index}/{segment_count}, "
-            f"key-range: {table1.min_key}..{table2.max_key}, "
-            f"size <= {max_rows}"
+            "%sDiffing segment %s/%s, key-range: %s..%s, size <= %s",
+            ". " * level,
+            segment_index,
+            segment_count,
+            table1.min_key,
+            table2.max_key,
+            max_rows,
         )
 
         # When benchmarking, we want the ability to skip checksumming. This
@@ -192,10 +257,24 @@ class HashDiffer(TableDiffer):
             if self.bisection_disabled or max_rows < self.bisection_threshold:
                 return self._bisect_and_diff_segments(ti, table1, table2, info_tree, level=level, max_rows=max_rows)
 
+        if self.skip_checksum_on_count_mismatch and table1.is_counted and table2.is_counted:
+            # Segments with different counts are certainly different, so there's no need to checksum them.
+            # (The counts are only known here when _prepare_segments expected them to save a checksum)
+            count1, count2 = table1.count(), table2.count()
+            if count1 != count2:
+                assert not info_tree.info.rowcounts
+                info_tree.info.rowcounts = (count1, count2)
+                info_tree.info.is_diff = True
+                if self.stop_at_top_level:
+                    return self._diff_segment_boundaries(table1, table2, info_tree, level)
+                return self._bisect_and_diff_segments(
+                    ti, table1, table2, info_tree, level=level, max_rows=max(count1, count2)
+                )
+
         (count1, checksum1), (count2, checksum2) = self._threaded_call("count_and_checksum", [table1, table2])
 
         assert not info_tree.info.rowcounts
-        info_tree.info.rowcounts = {1: count1, 2: count2}
+        info_tree.info.rowcounts = (count1, count2)
 
         if count1 == 0 and count2 == 0:
             logger.debug(
@@ -213,6 +292,8 @@ class HashDiffer(TableDiffer):
             return
 
         info_tree.info.is_diff = True
+        if self.stop_at_top_level:
+            return self._diff_segment_boundaries(table1, table2, info_tree, level)
         return self._bisect_and_diff_segments(ti, table1, table2, info_tree, level=level, max_rows=max(count1, count2))
 
     def _bisect_and_diff_segments(
@@ -234,18 +315,22 @@ class HashDiffer(TableDiffer):
 
         # If count is below the threshold, just download and compare the columns locally
         # This saves time, as bisection speed is limited by ping and query performance.
-        if self.bisection_disabled or max_rows < self.bisection_threshold or max_space_size < self.bisection_factor * 2:
+        # In chunked mode, the segments are already as small as they are going to get.
+        if (
+            self.bisection_disabled
+            or max_rows < self.bisection_threshold
+            or max_space_size < self.bisection_factor * 2
+            or (self.chunk_size and level > 0)
+        ):
+            if self.boundaries_only or self.stop_at_top_level:
+                return self._diff_segment_boundaries(table1, table2, info_tree, level)
+
             rows1, rows2 = self._threaded_call("get_values", [table1, table2])
-            json_cols = {
-                i: colname
-                for i, colname in enumerate(table1.extra_columns)
-                if isinstance(table1._schema[colname], JSON)
-            }
             diff = list(
                 diff_sets(
                     rows1,
                     rows2,
-                    json_cols=json_cols,
+                    json_cols=table1.json_columns,
                     columns1=table1.relevant_columns,
                     columns2=table2.relevant_columns,
                     key_columns1=table1.key_columns,
@@ -256,10 +341,66 @@ class HashDiffer(TableDiffer):
             )
 
             info_tree.info.set_diff(diff)
-            info_tree.info.rowcounts = {1: len(rows1), 2: len(rows2)}
+            info_tree.info.rowcounts = (len(rows1), len(rows2))
 
             logger.info(". " * level + f"Diff found {len(diff)} different rows.")
             self.stats["rows_downloaded"] = self.stats.get("rows_downloaded", 0) + max(len(rows1), len(rows2))
             return diff
 
+        if self.chunk_size:
+            # Split the key-space once into chunks of about chunk_size rows, and diff them all flat.
+            count1, count2 = self._threaded_call("count", [table1, table2])
+            biggest_table, biggest_count = (table1, count1) if count1 >= count2 else (table2, count2)
+            segment_count = max(biggest_count // self.chunk_size, 1)
+            checkpoints = biggest_table.choose_checkpoints(segment_count - 1)
+            return self._segment_and_diff(ti, table1, table2, info_tree, checkpoints, level, max_rows)
+
         return super()._bisect_and_diff_segments(ti, table1, table2, info_tree, level, max_rows)
+
+    def _prepare_segments(
+        self,
+        table1: TableSegment,
+        table2: TableSegment,
+        info_tree: InfoTree,
+        segmented1: List[TableSegment],
+        segmented2: List[TableSegment],
+    ) -> None:
+        if self.batch_checksums:
+            # The results are cached on the segments, so _diff_segments won't query them again
+            with self._run_in_background(
+                partial(table1.count_and_checksum_segments, segmented1),
+                partial(table2.count_and_checksum_segments, segmented2),
+            ):
+                pass
+
+        elif self.skip_checksum_on_count_mismatch and self._counts_differ(info_tree):
+            # At least one pair of sub-segments must have different counts too, and skip its checksum.
+            # Counting is much cheaper than checksumming, but it's still a query, so segments whose
+            # counts matched (the common case) are checksummed right away.
+            if self.enable_prefetch and self.threaded:
+                # Don't wait for the counts; _diff_segments will, when each segment gets its turn
+                for t in segmented1 + segmented2:
+                    t.prefetch_count(self._task_pool)
+            else:
+                self._threaded_call("count", segmented1 + segmented2)
+
+    @staticmethod
+    def _counts_differ(info_tree: InfoTree) -> bool:
+        rowcounts = info_tree.info.rowcounts
+        return rowcounts is not None and rowcounts[0] != rowcounts[1]
+
+    def _diff_segment_boundaries(self, table1: TableSegment, table2: TableSegment, info_tree: InfoTree, level: int):
+        """Report the key range of a differing leaf segment, without downloading its rows"""
+        if info_tree.info.is_diff is None:
+            # Not checked yet (e.g. the whole table is below the threshold)
+            (count1, checksum1), (count2, checksum2) = self._threaded_call("count_and_checksum", [table1, table2])
+            info_tree.info.rowcounts = (count1, count2)
+            if count1 == count2 and checksum1 == checksum2:
+                info_tree.info.set_diff([])
+                return []
+
+        diff = [("~", (table1.min_key, table1.max_key))]
+        info_tree.info.set_diff(diff)
+
+        logger.info(". " * level + f"Diff found in key-range {table1.min_key}..{table1.max_key}.")
+        return diff
@@ -1,4 +1,5 @@
-from typing import List, Dict, Optional, Any, Tuple, Union
+from itertools import chain
+from typing import Iterator, List, Dict, Optional, Any, Tuple, Union
 
 import attrs
 from typing_extensions import Self
@@ -6,18 +7,38 @@ from typing_extensions import Self
 from data_diff.table_segment import TableSegment
 
 
-@attrs.define(frozen=False)
+@attrs.define(frozen=False, slots=True, weakref_slot=False)
 class SegmentInfo:
     tables: List[TableSegment]
 
-    diff: Optional[List[Union[Tuple[Any, ...], List[Any]]]] = None
+    _diff: Optional[List[Union[Tuple[Any, ...], List[Any]]]] = None
     diff_schema: Optional[Tuple[Tuple[str, type], ...]] = None
     is_diff: Optional[bool] = None
     diff_count: Optional[int] = None
 
-    rowcounts: Dict[int, int] = attrs.field(factory=dict)
+    rowcounts: Optional[Tuple[int, int]] = None  # (table1, table2)
     max_rows: Optional[int] = None
 
+    # After aggregation, the diff is chained from the children only when it's read (see `diff`)
+    _diff_children: Optional[List["SegmentInfo"]] = attrs.field(default=None, init=False, eq=False, repr=False)
+
+    @property
+    def diff(self) -> Optional[List[Union[Tuple[Any, ...], List[Any]]]]:
+        if self._diff is None and self._diff_children is not None:
+            self._diff = list(self._iter_diff())
+        return self._diff
+
+    @diff.setter
+    def diff(self, diff: Optional[List[Union[Tuple[Any, ...], List[Any]]]]) -> None:
+        self._diff = diff
+        self._diff_children = None
+
+    def _iter_diff(self) -> Iterator[Union[Tuple[Any, ...], List[Any]]]:
+        # Walks down to the leaves, without materializing the diffs of the levels in between
+        if self._diff is not None or self._diff_children is None:
+            return iter(self._diff or ())
+        return chain.from_iterable(c._iter_diff() for c in self._diff_children)
+
     def set_diff(
         self, diff: List[Union[Tuple[Any, ...], List[Any]]], schema: Optional[Tuple[Tuple[str, type]]] = None
     ) -> None:
@@ -30,16 +51,28 @@ class SegmentInfo:
         child_infos = list(child_infos)
         assert child_infos
 
-        # self.diff = list(chain(*[c.diff for c in child_infos]))
-        self.diff_count = sum(c.diff_count for c in child_infos if c.diff_count is not None)
-        self.is_diff = any(c.is_diff for c in child_infos)
-        self.diff_schema = next((child.diff_schema for child in child_infos if child.diff_schema is not None), None)
-        self.diff = sum((c.diff for c in child_infos if c.diff is not None), [])
-
-        self.rowcounts = {
-            1: sum(c.rowcounts[1] for c in child_infos if c.rowcounts),
-            2: sum(c.rowcounts[2] for c in child_infos if c.rowcounts),
-        }
+        # Aggregate everything in a single pass over the children
+        diff_count = 0
+        is_diff = False
+        diff_schema = None
+        rowcount1 = rowcount2 = 0
+        for c in child_infos:
+            if c.diff_count is not None:
+                diff_count += c.diff_count
+            if c.is_diff:
+                is_diff = True
+            if diff_schema is None:
+                diff_schema = c.diff_schema
+            if c.rowcounts:
+                rowcount1 += c.rowcounts[0]
+                rowcount2 += c.rowcounts[1]
+
+        self.diff_count = diff_count
+        self.is_diff = is_diff
+        self.diff_schema = diff_schema
+        self._diff = None
+        self._diff_children = child_infos
+        self.rowcounts = (rowcount1, rowcount2)
 
     def to_dict(self) -> Dict[str, Any]:
         # Convert tables to something JSON-serializable (e.g., their names)
@@ -50,17 +83,18 @@ class SegmentInfo:
             "diff_schema": self.diff_schema,
             "is_diff": self.is_diff,
             "diff_count": self.diff_count,
-            "rowcounts": self.rowcounts,
+            "rowcounts": {1: self.rowcounts[0], 2: self.rowcounts[1]} if self.rowcounts else {},
             "max_rows": self.max_rows,
         }
 
 
-@attrs.define(frozen=True)
+@attrs.define(frozen=True, slots=True, weakref_slot=False)
 class InfoTree:
     SEGMENT_INFO_CLASS = SegmentInfo
 
     info: SegmentInfo
     children: List["InfoTree"] = attrs.field(factory=list)
+    _processed: bool = attrs.field(default=False, init=False, eq=False, repr=False)
 
     def add_node(self, table1: TableSegment, table2: TableSegment, max_rows: Optional[int] = None) -> Self:
         cls = self.__class__
@@ -69,10 +103,14 @@ class InfoTree:
         return node
 
     def aggregate_info(self) -> None:
+        if self._processed:
+            return
+
         if self.children:
             for c in self.children:
                 c.aggregate_info()
             self.info.update_from_children(c.info for c in self.children)
+        object.__setattr__(self, "_processed", True)  # frozen
 
     def to_dict(self) -> Dict[str, Any]:
         return {
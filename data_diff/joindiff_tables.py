@@ -3,7 +3,7 @@
 from decimal import Decimal
 from functools import partial
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional
 from itertools import chain
 
 import attrs
@@ -122,7 +122,9 @@ class JoinDiffer(TableDiffer):
         threaded (bool): Enable/disable threaded diffing. Needed to take advantage of database threads.
         max_threadpool_size (int): Maximum size of each threadpool. ``None`` means auto.
                                    Only relevant when `threaded` is ``True``.
-                                   There may be many pools, so number of actual threads can be a lot higher.
+                                   There may be many pools: one shared by the differ's short queries, plus one
+                                   per diff and per group of background queries. So the number of actual
+                                   threads can be a lot higher.
         validate_unique_key (bool): Enable/disable validating that the key columns are unique. (default: True)
                                     If there are no UNIQUE constraints in the schema, it is done in a single query,
                                     and can't be threaded, so it's very slow on non-cloud dbs.
@@ -188,9 +190,10 @@ class JoinDiffer(TableDiffer):
         db = table1.database
         diff_rows, a_cols, b_cols, is_diff_cols, all_rows = self._create_outer_join(table1, table2)
 
+        rowcounts = {}
         with self._run_in_background(
-            partial(self._collect_stats, 1, table1, info_tree),
-            partial(self._collect_stats, 2, table2, info_tree),
+            partial(self._collect_stats, 1, table1, info_tree, rowcounts),
+            partial(self._collect_stats, 2, table2, info_tree, rowcounts),
             partial(self._test_null_keys, table1, table2),
             partial(self._sample_and_count_exclusive, db, diff_rows, a_cols, b_cols, table1, table2),
             partial(self._count_diff_per_column, db, diff_rows, list(a_cols), is_diff_cols, table1, table2),
@@ -265,7 +268,7 @@ class JoinDiffer(TableDiffer):
                 else:
                     raise ValueError(f"NULL values in one or more primary keys of {ts.table_path}")
 
-    def _collect_stats(self, i, table_seg: TableSegment, info_tree: InfoTree):
+    def _collect_stats(self, i, table_seg: TableSegment, info_tree: InfoTree, rowcounts: Dict[int, int]):
         logger.debug(f"Collecting stats for table #{i}: {table_seg.table_path}")
         db = table_seg.database
 
@@ -295,7 +298,10 @@ class JoinDiffer(TableDiffer):
                 stat_name = f"table{i}_{col_name}"
 
                 if col_name == "count":
-                    info_tree.info.rowcounts[i] = value
+                    # Both tables are collected concurrently; whichever finishes last sets the pair
+                    rowcounts[i] = value
+                    if len(rowcounts) == 2:
+                        info_tree.info.rowcounts = (rowcounts[1], rowcounts[2])
 
                 if stat_name in self.stats:
                     self.stats[stat_name] += value
@@ -27,3 +27,4 @@ class ApplyFuncAndNormalizeAsString(ExprNode):
 @attrs.define(frozen=True)
 class Checksum(ExprNode):
     exprs: Sequence[Expr]
+    fast: bool = False  # Use the dialect's non-cryptographic hash, if it has one
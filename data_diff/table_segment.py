@@ -1,4 +1,5 @@
 import time
+from concurrent.futures import Executor, Future
 from typing import Container, Dict, List, Optional, Sequence, Tuple
 import logging
 from itertools import product
@@ -9,10 +10,10 @@ from typing_extensions import Self
 from data_diff.utils import safezip, Vector
 from data_diff.utils import ArithString, split_space
 from data_diff.databases.base import Database
-from data_diff.abcs.database_types import DbPath, DbKey, DbTime, IKey
+from data_diff.abcs.database_types import DbPath, DbKey, DbTime, IKey, JSON
 from data_diff.schema import RawColumnInfo, Schema, create_schema
 from data_diff.queries.extras import Checksum
-from data_diff.queries.api import Count, SKIP, table, this, Expr, min_, max_, Code
+from data_diff.queries.api import CaseWhen, Count, SKIP, table, this, Expr, min_, max_, Code
 from data_diff.queries.extras import ApplyFuncAndNormalizeAsString, NormalizeAsString
 
 logger = logging.getLogger("table_segment")
@@ -103,6 +104,8 @@ class TableSegment:
         where (str, optional): An additional 'where' expression to restrict the search space.
 
         case_sensitive (bool): If false, the case of column names will adjust according to the schema. Default is true.
+        fast_checksum (bool): If true, checksum with the dialect's non-cryptographic hash, when it has one.
+                              Both compared segments must use the same hash. Default is false.
 
     """
 
@@ -124,8 +127,20 @@ class TableSegment:
     where: Optional[str] = None
 
     case_sensitive: Optional[bool] = True
+    fast_checksum: bool = False
     _schema: Optional[Schema] = None
 
+    # Memoized results of count() and count_and_checksum().
+    # New instances (e.g. from new_key_bounds()) start without them.
+    _count: Optional[int] = attrs.field(default=None, init=False, eq=False, repr=False)
+    # Set by prefetch_count(), so that count() waits for the running query instead of starting another
+    _count_future: Optional[Future] = attrs.field(default=None, init=False, eq=False, repr=False)
+    _count_and_checksum: Optional[Tuple[int, Optional[int]]] = attrs.field(
+        default=None, init=False, eq=False, repr=False
+    )
+    # Memoized result of json_columns. Unlike the counts, new() passes it on, unless the columns or schema change.
+    _json_columns: Optional[Dict[int, str]] = attrs.field(default=None, init=False, eq=False, repr=False)
+
     def __attrs_post_init__(self) -> None:
         if not self.update_column and (self.min_update or self.max_update):
             raise ValueError("Error: the min_update/max_update feature requires 'update_column' to be set.")
@@ -169,6 +184,20 @@ class TableSegment:
         if self.max_update is not None:
             yield this[self.update_column] < self.max_update
 
+    def with_json_columns(self) -> Self:
+        "Finds the extra columns that hold JSON (requires a schema), and returns a TableSegment that remembers them."
+        if self._json_columns is None:
+            object.__setattr__(self, "_json_columns", self._find_json_columns())  # Bypass frozen, it's only a cache
+        return self
+
+    def _find_json_columns(self) -> Dict[int, str]:
+        return {i: c for i, c in enumerate(self.extra_columns) if isinstance(self._schema[c], JSON)}
+
+    @property
+    def json_columns(self) -> Dict[int, str]:
+        "The extra columns that hold JSON, by their index in extra_columns. Requires a schema."
+        return self.with_json_columns()._json_columns
+
     @property
     def source_table(self):
         return table(*self.table_path, schema=self._schema)
@@ -203,7 +232,10 @@ class TableSegment:
 
     def new(self, **kwargs) -> Self:
         """Creates a copy of the instance using 'replace()'"""
-        return attrs.evolve(self, **kwargs)
+        segment = attrs.evolve(self, **kwargs)
+        if self._json_columns is not None and "schema" not in kwargs and "extra_columns" not in kwargs:
+            object.__setattr__(segment, "_json_columns", self._json_columns)  # Bypass frozen, it's only a cache
+        return segment
 
     def new_key_bounds(self, min_key: Vector, max_key: Vector, *, key_types: Optional[Sequence[IKey]] = None) -> Self:
         if self.min_key is not None:
@@ -221,7 +253,7 @@ class TableSegment:
             min_key = Vector(type.make_value(val) for type, val in safezip(key_types, min_key))
             max_key = Vector(type.make_value(val) for type, val in safezip(key_types, max_key))
 
-        return attrs.evolve(self, min_key=min_key, max_key=max_key)
+        return self.new(min_key=min_key, max_key=max_key)
 
     @property
     def relevant_columns(self) -> List[str]:
@@ -233,17 +265,47 @@ class TableSegment:
         return list(self.key_columns) + extras
 
     def count(self) -> int:
-        """Count how many rows are in the segment, in one pass."""
-        return self.database.query(self.make_select().select(Count()), int)
+        """Count how many rows are in the segment, in one pass.
+
+        The result is memoized on the instance, so repeated calls don't query the database again.
+        """
+        if self._count is None:
+            if self._count_future is not None:
+                return self._count_future.result()
+            return self._query_count()
+        return self._count
+
+    def _query_count(self) -> int:
+        count = self.database.query(self.make_select().select(Count()), int)
+        self._set_count(count)
+        return count
+
+    def prefetch_count(self, executor: Executor) -> None:
+        """Start counting the rows in the background, using the given executor.
+
+        A later count() waits for this query, and raises its error if it failed.
+        """
+        if self._count is None and self._count_future is None:
+            object.__setattr__(self, "_count_future", executor.submit(self._query_count))  # Bypass frozen, a cache
+
+    @property
+    def is_counted(self) -> bool:
+        "Whether the row count is already known or being fetched, so count() won't start a new query"
+        return self._count is not None or self._count_future is not None
+
+    def _set_count(self, count: int) -> None:
+        object.__setattr__(self, "_count", count)  # Bypass frozen, it's only a cache
 
     def count_and_checksum(self) -> Tuple[int, int]:
         """Count and checksum the rows in the segment, in one pass."""
+        if self._count_and_checksum is not None:
+            return self._count_and_checksum
 
         checked_columns = [c for c in self.relevant_columns if c not in self.ignored_columns]
         cols = [NormalizeAsString(this[c]) for c in checked_columns]
 
         start = time.monotonic()
-        q = self.make_select().select(Count(), Checksum(cols))
+        q = self.make_select().select(Count(), Checksum(cols, fast=self.fast_checksum))
         count, checksum = self.database.query(q, tuple)
         duration = time.monotonic() - start
         if duration > RECOMMENDED_CHECKSUM_DURATION:
@@ -255,7 +317,31 @@ class TableSegment:
 
         if count:
             assert checksum, (count, checksum)
-        return count or 0, int(checksum) if count else None
+        return self._set_count_and_checksum(count, checksum)
+
+    def _set_count_and_checksum(self, count: Optional[int], checksum) -> Tuple[int, Optional[int]]:
+        result = count or 0, int(checksum) if count else None
+        self._set_count(result[0])
+        object.__setattr__(self, "_count_and_checksum", result)  # Bypass frozen, it's only a cache
+        return result
+
+    def count_and_checksum_segments(self, segments: Sequence["TableSegment"]) -> None:
+        """Count and checksum the given sub-segments of this segment, in a single query grouped by segment.
+
+        The results are cached on the segments, so their count() and count_and_checksum() don't query again.
+        """
+        checked_columns = [c for c in self.relevant_columns if c not in self.ignored_columns]
+        cols = [NormalizeAsString(this[c]) for c in checked_columns]
+
+        segment_index = CaseWhen([])
+        for i, segment in enumerate(segments):
+            segment_index = segment_index.when(*segment._make_key_range()).then(i)
+
+        q = self.make_select().group_by(segment_index).agg(Count(), Checksum(cols, fast=self.fast_checksum))
+        rows = self.database.query(q, List[Tuple])
+        results = {int(i): (count, checksum) for i, count, checksum in rows if i is not None}
+        for i, segment in enumerate(segments):
+            segment._set_count_and_checksum(*results.get(i, (0, None)))
 
     def query_key_range(self) -> Tuple[tuple, tuple]:
         """Query database for minimum and maximum key. This is used for setting the initial bounds."""
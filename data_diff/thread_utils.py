@@ -1,4 +1,5 @@
 import itertools
+import threading
 from queue import PriorityQueue
 from collections import deque
 from collections.abc import Iterable
@@ -45,6 +46,10 @@ class ThreadedYielder(Iterable):
 
     To add a source iterator, call ``submit()`` with a function that returns an iterator.
     Priority for the iterator can be provided via the keyword argument 'priority'. (higher runs first)
+
+    Call ``stop()`` to cancel the remaining work. If ``stop_on_first`` is set, it is called
+    automatically when the first result is yielded. It is also called when the iterator is closed
+    before it's exhausted (e.g. when the consumer takes only the first few results, with islice).
     """
 
     _pool: ThreadPoolExecutor
@@ -57,16 +62,25 @@ class ThreadedYielder(Iterable):
     _yield: deque = attrs.field(alias="_yield")  # Python keyword!
     _exception: Optional[None]
     yield_list: bool
+    stop_on_first: bool
+    stop_event: threading.Event
 
-    def __init__(self, max_workers: Optional[int] = None, yield_list: bool = False) -> None:
+    def __init__(
+        self, max_workers: Optional[int] = None, yield_list: bool = False, stop_on_first: bool = False
+    ) -> None:
         super().__init__()
         self._pool = PriorityThreadPoolExecutor(max_workers)
         self._futures = deque()
         self._yield = deque()
         self._exception = None
         self.yield_list = yield_list
+        self.stop_on_first = stop_on_first
+        self.stop_event = threading.Event()
 
     def _worker(self, fn, *args, **kwargs) -> None:
+        if self.stop_event.is_set():
+            return
+
         try:
             res = fn(*args, **kwargs)
             if res is not None:
@@ -80,19 +94,35 @@ class ThreadedYielder(Iterable):
     def submit(self, fn: Callable, *args, priority: int = 0, **kwargs) -> None:
         self._futures.append(self._pool.submit(self._worker, fn, *args, priority=priority, **kwargs))
 
-    def __iter__(self) -> Iterator[Any]:
-        while True:
-            if self._exception:
-                raise self._exception
-
-            while self._yield:
-                yield self._yield.popleft()
+    def stop(self) -> None:
+        "Cancel all the work that hasn't started yet. Running tasks are expected to check ``stop_event``."
+        self.stop_event.set()
+        for future in list(self._futures):
+            future.cancel()
 
-            if not self._futures:
-                # No more tasks
-                return
-
-            if self._futures[0].done():
-                self._futures.popleft()
-            else:
-                sleep(0.001)
+    def __iter__(self) -> Iterator[Any]:
+        try:
+            while True:
+                if self._exception:
+                    raise self._exception
+
+                while self._yield:
+                    item = self._yield.popleft()
+                    if self.stop_on_first:
+                        self.stop()
+                        yield item
+                        return
+                    yield item
+
+                if not self._futures:
+                    # No more tasks
+                    return
+
+                if self._futures[0].done():
+                    self._futures.popleft()
+                else:
+                    sleep(0.001)
+        except GeneratorExit:
+            # The consumer doesn't want any more results
+            self.stop()
+            raise
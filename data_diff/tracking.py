@@ -205,7 +205,7 @@ def convert_sets_to_lists(obj):
     """
     Recursively convert sets in the given object to lists.
     """
-    if isinstance(obj, set):
+    if isinstance(obj, (set, frozenset)):
         return list(obj)
     elif isinstance(obj, dict):
         return {k: convert_sets_to_lists(v) for k, v in obj.items()}
@@ -4,6 +4,7 @@ import math
 import re
 import string
 from abc import abstractmethod
+from itertools import starmap
 from typing import Any, Dict, Iterable, Iterator, List, MutableMapping, Optional, Sequence, TypeVar, Union
 from urllib.parse import urlparse
 import operator
@@ -163,6 +164,10 @@ class ArithUUID(ArithString):
     def __int__(self) -> int:
         return self.uuid.int
 
+    def __str__(self) -> str:
+        s = str(self.uuid)
+        return s.upper() if self.uppercase else s.lower() if self.lowercase else s
+
     def __add__(self, other: int) -> Self:
         if isinstance(other, int):
             return attrs.evolve(self, uuid=self.uuid.int + other)
@@ -424,32 +429,32 @@ class Vector(tuple):
 
     def __lt__(self, other: "Vector") -> bool:
         if isinstance(other, Vector):
-            return all(a < b for a, b in safezip(self, other))
+            return all(starmap(operator.lt, safezip(self, other)))
         return NotImplemented
 
     def __le__(self, other: "Vector") -> bool:
         if isinstance(other, Vector):
-            return all(a <= b for a, b in safezip(self, other))
+            return all(starmap(operator.le, safezip(self, other)))
         return NotImplemented
 
     def __gt__(self, other: "Vector") -> bool:
         if isinstance(other, Vector):
-            return all(a > b for a, b in safezip(self, other))
+            return all(starmap(operator.gt, safezip(self, other)))
         return NotImplemented
 
     def __ge__(self, other: "Vector") -> bool:
         if isinstance(other, Vector):
-            return all(a >= b for a, b in safezip(self, other))
+            return all(starmap(operator.ge, safezip(self, other)))
         return NotImplemented
 
     def __eq__(self, other: "Vector") -> bool:
         if isinstance(other, Vector):
-            return all(a == b for a, b in safezip(self, other))
+            return all(starmap(operator.eq, safezip(self, other)))
         return NotImplemented
 
     def __sub__(self, other: "Vector") -> "Vector":
         if isinstance(other, Vector):
-            return Vector((a - b) for a, b in safezip(self, other))
+            return Vector(starmap(operator.sub, safezip(self, other)))
         raise NotImplementedError()
 
     def __repr__(self) -> str:
@@ -523,17 +528,16 @@ def diffs_are_equiv_jsons(diff: list, json_cols: dict):
     overriden_diff_cols = set()
     if (len(diff) != 2) or ({diff[0][0], diff[1][0]} != {"+", "-"}):
         return False, overriden_diff_cols
-    match = True
-    for i, (col_a, col_b) in enumerate(safezip(diff[0][1][1:], diff[1][1][1:])):  # index 0 is extra_columns first elem
-        # we only attempt to parse columns of JSON type, but we still need to check if non-json columns don't match
-        match = col_a == col_b
-        if not match and (i in json_cols):
-            if _jsons_equiv(col_a, col_b):
-                overriden_diff_cols.add(json_cols[i])
-                match = True
-        if not match:
-            break
-    return match, overriden_diff_cols
+    row_a, row_b = diff[0][1][1:], diff[1][1][1:]  # index 0 is extra_columns first elem
+    mismatched = [i for i, (col_a, col_b) in enumerate(safezip(row_a, row_b)) if col_a != col_b]
+    # we only attempt to parse columns of JSON type, and only once we know all the non-json columns match
+    if any(i not in json_cols for i in mismatched):
+        return False, overriden_diff_cols
+    for i in mismatched:
+        if not _jsons_equiv(row_a[i], row_b[i]):
+            return False, overriden_diff_cols
+        overriden_diff_cols.add(json_cols[i])
+    return True, overriden_diff_cols
 
 
 def columns_removed_template(columns_removed: set) -> str:
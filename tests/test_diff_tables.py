@@ -1,17 +1,25 @@
 from datetime import datetime, timedelta
+from itertools import islice
 from typing import Callable
+import json
 import uuid
+import threading
 import unittest
 import os
 
 import attrs
 
 from data_diff.queries.api import table, this, commit, code
-from data_diff.utils import ArithAlphanumeric, numberToAlphanum
+from data_diff.utils import ArithAlphanumeric, CaseSensitiveDict, numberToAlphanum
+from data_diff.abcs.database_types import JSON
 
-from data_diff.hashdiff_tables import HashDiffer
+from data_diff.diff_tables import ColumnarDiffList, DiffResultWrapper, ThreadBase
+from data_diff.info_tree import InfoTree, SegmentInfo
+from data_diff.hashdiff_tables import HashDiffer, diff_sets
 from data_diff.joindiff_tables import JoinDiffer
 from data_diff.table_segment import TableSegment, split_space, Vector
+from data_diff.thread_utils import ThreadedYielder
+from data_diff.tracking import convert_sets_to_lists
 from data_diff import databases as db
 
 from tests.common import str_to_checksum, test_each_database_in_list, DiffTestCase, table_segment
@@ -41,6 +49,274 @@ class TestUtils(unittest.TestCase):
                     assert len(r) == n, f"split_space({i}, {j + n}, {n}) = {(r)}"
 
 
+class TestDiffResultWrapper(unittest.TestCase):
+    def setUp(self):
+        ts = TableSegment(None, ("a",), ("id",), extra_columns=("x",))
+        self.info_tree = InfoTree(SegmentInfo([ts, ts], rowcounts=(10, 10)))
+        self.diff = [("-", ("1", "a")), ("+", ("1", "b")), ("-", ("2", "a")), ("+", ("3", "c"))]
+
+    def test_stats(self):
+        diff_res = DiffResultWrapper(iter(self.diff), self.info_tree, {})
+        stats = diff_res._get_stats()
+        self.assertEqual(stats.diff_by_sign, {"+": 1, "-": 1, "!": 1})
+        self.assertEqual(stats.unchanged, 8)
+        self.assertAlmostEqual(stats.diff_percent, 0.2)
+        self.assertIsNone(stats.extra_column_diffs)
+        self.assertEqual(list(diff_res), self.diff)
+
+    def test_stats_with_key_ranges(self):
+        diff = self.diff + [("~", (Vector((5,)), Vector((9,))))]
+        diff_res = DiffResultWrapper(iter(diff), self.info_tree, {})
+        stats = diff_res._get_stats()
+        self.assertEqual(stats.diff_ranges, 1)
+        # The rows in the range weren't compared, so they can't be counted as unchanged
+        self.assertIsNone(stats.unchanged)
+        self.assertIsNone(stats.diff_percent)
+        self.assertNotIn("unchanged", diff_res.get_stats_string())
+        self.assertIsNone(diff_res.get_stats_dict()["unchanged"])
+
+    def test_stats_when_stopped_at_top_level(self):
+        diff = [("~", (Vector((5,)), Vector((9,))))]
+        diff_res = DiffResultWrapper(iter(diff), self.info_tree, {}, stop_at_top_level=True)
+        stats = diff_res._get_stats()
+        # info_tree was only partially counted before the diff was stopped
+        self.assertIsNone(stats.table1_count)
+        self.assertIsNone(stats.table2_count)
+        self.assertIsNone(stats.unchanged)
+        self.assertNotIn("rows in table", diff_res.get_stats_string())
+        self.assertIsNone(diff_res.get_stats_dict()["rows_A"])
+
+        # Without a difference, the whole tree was checked
+        diff_res = DiffResultWrapper(iter([]), self.info_tree, {}, stop_at_top_level=True)
+        self.assertEqual(diff_res._get_stats().table1_count, 10)
+        self.assertEqual(diff_res._get_stats().unchanged, 10)
+
+    def test_stats_are_cached(self):
+        diff_res = DiffResultWrapper(iter(self.diff), self.info_tree, {})
+        stats = diff_res._get_stats()
+        self.assertIs(diff_res._get_stats(), stats)
+        self.assertIsNot(diff_res._get_stats(is_dbt=True), stats)
+        self.assertEqual(diff_res.get_stats_dict()["total"], 3)
+
+    def test_stats_cached_only_when_final(self):
+        diff_res = DiffResultWrapper(iter(self.diff), self.info_tree, {})
+        with unittest.mock.patch.object(DiffResultWrapper, "_compute_stats", autospec=True) as compute_stats:
+            # Stats of a diff that isn't consumed yet may still change
+            diff_res._get_stats()
+            diff_res._get_stats()
+            self.assertEqual(compute_stats.call_count, 2)
+
+            list(diff_res)
+            diff_res._get_stats()
+            diff_res._get_stats()
+            self.assertEqual(compute_stats.call_count, 3)
+
+    def test_stats_after_close(self):
+        diff_res = DiffResultWrapper(iter(self.diff), self.info_tree, {})
+        self.assertEqual(list(islice(diff_res, 1)), self.diff[:1])
+        with unittest.mock.patch.object(DiffResultWrapper, "_compute_stats", autospec=True) as compute_stats:
+            compute_stats.side_effect = lambda wrapper, is_dbt: wrapper._closed_early
+            self.assertFalse(diff_res._get_stats())
+            diff_res.close()
+            # The stats read before close() aren't reused, and the new ones are final
+            self.assertTrue(diff_res._get_stats())
+            self.assertTrue(diff_res._get_stats())
+            self.assertEqual(compute_stats.call_count, 2)
+
+    def test_any_diff(self):
+        def diff():
+            yield self.diff[0]
+            raise AssertionError("consumed too far")
+
+        diff_res = DiffResultWrapper(diff(), self.info_tree, {})
+        self.assertTrue(diff_res.any_diff())
+        self.assertTrue(diff_res.any_diff())
+        # The rest of the diff was cancelled
+        self.assertEqual(list(diff_res), self.diff[:1])
+        self.assertIsNone(diff_res.get_stats_dict()["rows_A"])
+
+        diff_res = DiffResultWrapper(iter([]), self.info_tree, {})
+        self.assertFalse(diff_res.any_diff())
+        self.assertEqual(diff_res.get_stats_dict()["rows_A"], 10)
+
+    def test_stats_dbt(self):
+        diff_res = DiffResultWrapper(iter(self.diff), self.info_tree, {})
+        stats = diff_res._get_stats(is_dbt=True)
+        self.assertEqual(stats.diff_by_sign, {"+": 1, "-": 1, "!": 1})
+        self.assertEqual(stats.extra_column_diffs, {"x": 1})
+
+    def test_stats_with_rows_out_of_layout(self):
+        # Rows of another width, or lists (see yield_list), are stored outside the columns, but still counted
+        diff = self.diff + [("+", ("4",)), ("-", ["5", "e"]), ("+", ["5", "f"])]
+        diff_res = DiffResultWrapper(iter(diff), self.info_tree, {})
+        stats = diff_res._get_stats(is_dbt=True)
+        self.assertEqual(len(diff_res.result_list.others), 3)
+        self.assertEqual(stats.diff_by_sign, {"+": 2, "-": 1, "!": 2})
+        self.assertEqual(stats.extra_column_diffs, {"x": 2})
+        self.assertEqual(stats.unchanged, 7)
+
+    def test_stats_with_ranges(self):
+        diff = [("~", (Vector((1,)), Vector((5,))))] + self.diff
+        stats = DiffResultWrapper(iter(diff), self.info_tree, {})._get_stats()
+        self.assertEqual(stats.diff_by_sign, {"+": 1, "-": 1, "!": 1})
+        self.assertEqual(stats.diff_ranges, 1)
+
+
+class TestDiffSets(unittest.TestCase):
+    def _diff_sets(self, a, b, ignored_columns=()):
+        return list(
+            diff_sets(
+                a,
+                b,
+                columns1=("id", "x", "y"),
+                columns2=("id", "x", "y"),
+                key_columns1=("id",),
+                key_columns2=("id",),
+                ignored_columns1=ignored_columns,
+                ignored_columns2=ignored_columns,
+            )
+        )
+
+    def test_diff_sets(self):
+        a = [(1, "a", 1), (2, "b", 2), (3, "c", 3)]
+        b = [(1, "a", 1), (2, "b", 0), (4, "d", 4)]
+        self.assertEqual(
+            self._diff_sets(a, b),
+            [("-", (2, "b", 2)), ("+", (2, "b", 0)), ("-", (3, "c", 3)), ("+", (4, "d", 4))],
+        )
+
+    def test_ignored_columns(self):
+        a = [(1, "a", 1), (2, "b", 2)]
+        b = [(1, "a", 0), (2, "x", 0)]
+        self.assertEqual(self._diff_sets(a, b, ignored_columns={"y"}), [("-", (2, "b", 2)), ("+", (2, "x", 0))])
+
+    def test_duplicates(self):
+        a = [(1, "a", 1), (1, "a", 1)]
+        b = [(1, "a", 1)]
+        self.assertEqual(self._diff_sets(a, b), [("-", (1, "a", 1)), ("-", (1, "a", 1)), ("+", (1, "a", 1))])
+
+
+class TestAggregateInfo(unittest.TestCase):
+    def test_aggregate_info_once(self):
+        ts = TableSegment(None, ("a",), ("id",))
+        info_tree = InfoTree(SegmentInfo([ts, ts]))
+        info_tree.add_node(ts, ts).info.set_diff([("-", ("1",))])
+        info_tree.add_node(ts, ts).info.set_diff([])
+
+        with unittest.mock.patch.object(
+            SegmentInfo, "update_from_children", autospec=True, side_effect=SegmentInfo.update_from_children
+        ) as update_from_children:
+            info_tree.aggregate_info()
+            info_tree.aggregate_info()
+        update_from_children.assert_called_once()
+        self.assertEqual(info_tree.info.diff_count, 1)
+        self.assertTrue(info_tree.info.is_diff)
+
+    def test_diff_is_chained_lazily(self):
+        ts = TableSegment(None, ("a",), ("id",))
+        info_tree = InfoTree(SegmentInfo([ts, ts]))
+        node = info_tree.add_node(ts, ts)
+        node.add_node(ts, ts).info.set_diff([("-", ("1",))])
+        node.add_node(ts, ts).info.set_diff([("+", ("2",))])
+        info_tree.add_node(ts, ts).info.set_diff([])
+        info_tree.aggregate_info()
+
+        self.assertEqual(info_tree.info.diff, [("-", ("1",)), ("+", ("2",))])
+        # The levels in between aren't materialized to build the root's diff
+        self.assertIsNone(node.info._diff)
+        self.assertEqual(node.info.diff, [("-", ("1",)), ("+", ("2",))])
+
+
+class TestColumnarDiffList(unittest.TestCase):
+    def test_iter_preserves_items(self):
+        items = [
+            ("-", ("1", "a")),
+            ("~", (Vector((1,)), Vector((5,)))),
+            ("+", ("1", "b")),
+            ("+", ("2",)),
+            ("-", ("3", "c")),
+        ]
+        result_list = ColumnarDiffList()
+        for item in items:
+            result_list.append(item)
+
+        self.assertEqual(len(result_list), len(items))
+        self.assertEqual(len(result_list.columns), 2)
+        self.assertEqual(list(result_list), items)
+
+
+class TestThreadBase(unittest.TestCase):
+    def test_thread_as_completed_is_bounded(self):
+        consumed = []
+
+        def items():
+            for i in range(100):
+                consumed.append(i)
+                yield i
+
+        with ThreadBase(max_threadpool_size=2) as tb:
+            results = tb._thread_as_completed(lambda x: x * 2, items())
+            first = next(results)
+            # At most 2 * max_threadpool_size items are pulled before the first result is available
+            self.assertLessEqual(len(consumed), 5)
+            self.assertEqual(sorted([first, *results]), [i * 2 for i in range(100)])
+
+    def test_threaded_call(self):
+        class Obj:
+            def __init__(self, value):
+                self.value = value
+
+            def get(self):
+                return self.value, threading.get_ident()
+
+        with ThreadBase(max_threadpool_size=2) as tb:
+            (v1, thread1), (v2, thread2) = tb._threaded_call("get", [Obj(1), Obj(2)])
+        self.assertEqual((v1, v2), (1, 2))
+        # The first call is made on the calling thread, the rest in the pool
+        self.assertEqual(thread1, threading.get_ident())
+        self.assertNotEqual(thread2, threading.get_ident())
+
+    def test_background_tasks_dont_hold_the_shared_pool(self):
+        class Obj:
+            def get(self):
+                return threading.get_ident()
+
+        done = threading.Event()
+        with ThreadBase(max_threadpool_size=1) as tb:
+            # The background task waits for a threaded call, which needs a worker of the shared pool
+            with tb._run_in_background(lambda: self.assertTrue(done.wait(10))):
+                tb._threaded_call("get", [Obj(), Obj()])
+                done.set()
+
+    def test_threaded_yielder_stops_when_closed(self):
+        ti = ThreadedYielder(max_workers=1)
+        for i in range(100):
+            ti.submit(lambda i=i: [i], priority=-i)
+
+        results = iter(ti)
+        self.assertEqual(next(results), 0)
+        results.close()
+        self.assertTrue(ti.stop_event.is_set())
+        self.assertTrue(any(future.cancelled() for future in ti._futures))
+
+
+class TestIgnoreColumn(unittest.TestCase):
+    def test_ignore_column_replaces_sets(self):
+        differ = HashDiffer(ignored_columns1={"a"})
+        ignored_columns1 = differ.ignored_columns1
+        differ.ignore_column("b", "c")
+
+        # Snapshots taken earlier are left as they were
+        self.assertEqual(ignored_columns1, frozenset({"a"}))
+        self.assertEqual(differ.ignored_columns1, frozenset({"a", "b"}))
+        self.assertEqual(differ.ignored_columns2, frozenset({"c"}))
+
+    def test_ignored_columns_in_tracking_event(self):
+        differ = HashDiffer(ignored_columns1={"a"})
+        event = convert_sets_to_lists({"ignored_columns1": differ.ignored_columns1})
+        self.assertEqual(json.loads(json.dumps(event)), {"ignored_columns1": ["a"]})
+
+
 @test_each_database
 class TestDates(DiffTestCase):
     src_schema = {"id": int, "datetime": datetime, "text_comment": str}
@@ -180,8 +456,8 @@ class TestDiffTables(DiffTestCase):
 
         expected = [("-", ("2", time + ".000000"))]
         self.assertEqual(expected, diff)
-        self.assertEqual(2, info.rowcounts[1])
-        self.assertEqual(1, info.rowcounts[2])
+        self.assertEqual(2, info.rowcounts[0])
+        self.assertEqual(1, info.rowcounts[1])
 
     def test_non_threaded(self):
         differ = HashDiffer(bisection_factor=3, bisection_threshold=4, threaded=False)
@@ -237,8 +513,8 @@ class TestDiffTables(DiffTestCase):
 
         expected = [("-", ("5", time + ".000000"))]
         self.assertEqual(expected, diff)
-        self.assertEqual(5, info.rowcounts[1])
-        self.assertEqual(4, info.rowcounts[2])
+        self.assertEqual(5, info.rowcounts[0])
+        self.assertEqual(4, info.rowcounts[1])
 
     def test_return_empty_array_when_same(self):
         time = "2022-01-01 00:00:00"
@@ -511,6 +787,20 @@ class TestTableSegment(DiffTestCase):
 
         self.assertRaises(ValueError, attrs.evolve, self.table, min_key=Vector((10,)), max_key=Vector((0,)))
 
+    def test_count_is_memoized(self):
+        src_table = table(self.table_src_path, schema={"id": int, "userid": int, "timestamp": datetime})
+        self.connection.query([src_table.create(), commit])
+
+        segment = self.table.with_schema()
+        db_cls = type(self.connection)
+        with unittest.mock.patch.object(db_cls, "query", autospec=True, side_effect=db_cls.query) as query:
+            self.assertEqual(segment.count(), 0)
+            self.assertEqual(segment.count(), 0)
+        self.assertEqual(query.call_count, 1)
+
+        # New segments don't inherit the memoized count
+        self.assertIsNone(segment.new(where="1=1")._count)
+
     def test_case_awareness(self):
         src_table = table(self.table_src_path, schema={"id": int, "userid": int, "timestamp": datetime})
 
@@ -731,7 +1021,7 @@ class TestInfoTree(DiffTestCase):
             info_tree = diff_res.info_tree
             assert info_tree.info.is_diff
             assert info_tree.info.diff_count == 1000
-            self.assertEqual(info_tree.info.rowcounts, {1: 1000, 2: 2000})
+            self.assertEqual(info_tree.info.rowcounts, (1000, 2000))
 
     def test_auto_bisection_factor(self):
         """
@@ -940,3 +1230,296 @@ class TestCompoundKeyAlphanum(DiffTestCase):
         self.assertEqual(diff, [("-", (uuid, "9", "9")), ("+", (uuid, "9000", "9"))])
 
         self.assertRaises(ValueError, list, differ.diff_tables(aa, a))
+
+
+class HalfMissingTestCase(DiffTestCase):
+    """Diffs the ids 0..99 against only their even half"""
+
+    src_schema = {"id": int}
+    dst_schema = {"id": int}
+
+    def setUp(self):
+        super().setUp()
+
+        self.connection.query(
+            [
+                self.src_table.insert_rows([i] for i in range(100)),
+                self.dst_table.insert_rows([i] for i in range(0, 100, 2)),
+                commit,
+            ]
+        )
+
+        self.a = TableSegment(self.connection, self.src_table.path, ("id",))
+        self.b = TableSegment(self.connection, self.dst_table.path, ("id",))
+
+
+@test_each_database
+class TestSkipChecksumOnCountMismatch(HalfMissingTestCase):
+    def test_checksum_skipped(self):
+        differ = HashDiffer(bisection_factor=2, bisection_threshold=10)
+        with unittest.mock.patch.object(
+            TableSegment, "count_and_checksum", autospec=True, side_effect=TableSegment.count_and_checksum
+        ) as count_and_checksum:
+            diff = list(differ.diff_tables(self.a, self.b))
+        self.assertEqual(len(diff), 50)
+        # Only the first level is checksummed. Below it, the counts are known to differ.
+        self.assertEqual(count_and_checksum.call_count, 4)
+
+    def test_no_count_when_counts_match(self):
+        differ = HashDiffer(bisection_factor=2, bisection_threshold=10)
+        with unittest.mock.patch.object(TableSegment, "count", autospec=True, side_effect=TableSegment.count) as count:
+            self.assertEqual(list(differ.diff_tables(self.a, self.a)), [])
+        count.assert_not_called()
+
+    def test_checksum_not_skipped(self):
+        differ = HashDiffer(bisection_factor=2, bisection_threshold=10, skip_checksum_on_count_mismatch=False)
+        with unittest.mock.patch.object(
+            TableSegment, "count_and_checksum", autospec=True, side_effect=TableSegment.count_and_checksum
+        ) as count_and_checksum:
+            diff = list(differ.diff_tables(self.a, self.b))
+        self.assertEqual(len(diff), 50)
+        count_and_checksum.assert_called()
+
+    def test_no_count_for_checkpoints(self):
+        differ = HashDiffer(bisection_factor=2, bisection_threshold=10, skip_checksum_on_count_mismatch=False)
+        with unittest.mock.patch.object(TableSegment, "count", autospec=True, side_effect=TableSegment.count) as count:
+            diff = list(differ.diff_tables(self.a, self.b))
+        self.assertEqual(len(diff), 50)
+        count.assert_not_called()
+
+
+@test_each_database
+class TestBatchChecksums(HalfMissingTestCase):
+    def test_batch_checksums(self):
+        table = self.a.with_schema().new_key_bounds(min_key=Vector((0,)), max_key=Vector((100,)))
+        checkpoints = [[0, 10, 50, 60, 100]]
+        segments = table.segment_by_checkpoints(checkpoints)
+        table.count_and_checksum_segments(segments)
+        self.assertEqual(
+            [segment.count_and_checksum() for segment in segments],
+            [segment.count_and_checksum() for segment in table.segment_by_checkpoints(checkpoints)],
+        )
+
+        differ = HashDiffer(bisection_factor=4, bisection_threshold=10, batch_checksums=True)
+        with unittest.mock.patch.object(
+            TableSegment,
+            "count_and_checksum_segments",
+            autospec=True,
+            side_effect=TableSegment.count_and_checksum_segments,
+        ) as count_and_checksum_segments:
+            diff = list(differ.diff_tables(self.a, self.b))
+        self.assertEqual(len(diff), 50)
+        count_and_checksum_segments.assert_called()
+
+
+@test_each_database
+class TestFastChecksum(HalfMissingTestCase):
+    def test_fast_checksum(self):
+        table = self.a.with_schema()
+        fast_table = table.new(fast_checksum=True)
+        self.assertEqual(fast_table.count(), table.count())
+        if self.connection.dialect.SUPPORTS_FAST_HASH:
+            self.assertNotEqual(fast_table.count_and_checksum(), table.count_and_checksum())
+
+        for fast_checksum in (True, False):
+            differ = HashDiffer(bisection_factor=2, bisection_threshold=10, fast_checksum=fast_checksum)
+            self.assertEqual(len(list(differ.diff_tables(self.a, self.b))), 50)
+
+    def test_off_by_default(self):
+        differ = HashDiffer(bisection_factor=2, bisection_threshold=10)
+        with unittest.mock.patch.object(
+            TableSegment, "count_and_checksum", autospec=True, side_effect=TableSegment.count_and_checksum
+        ) as count_and_checksum:
+            self.assertEqual(len(list(differ.diff_tables(self.a, self.b))), 50)
+
+        self.assertTrue(count_and_checksum.called)
+        self.assertFalse(any(segment.fast_checksum for (segment,), _ in count_and_checksum.call_args_list))
+
+
+@test_each_database
+class TestPrefetch(HalfMissingTestCase):
+    def test_prefetch(self):
+        count_queries = {}
+        for enable_prefetch in (False, True):
+            differ = HashDiffer(bisection_factor=2, bisection_threshold=10, enable_prefetch=enable_prefetch)
+            with unittest.mock.patch.object(
+                TableSegment, "_query_count", autospec=True, side_effect=TableSegment._query_count
+            ) as query_count:
+                self.assertEqual(len(list(differ.diff_tables(self.a, self.b))), 50)
+            count_queries[enable_prefetch] = query_count.call_count
+        # Prefetching only moves the count queries to the background; each segment is still counted once
+        self.assertGreater(count_queries[False], 0)
+        self.assertEqual(count_queries[True], count_queries[False])
+
+        # Segments whose counts matched aren't counted (or prefetched) at all
+        differ = HashDiffer(bisection_factor=2, bisection_threshold=10, enable_prefetch=True)
+        with unittest.mock.patch.object(TableSegment, "_query_count", autospec=True) as query_count:
+            self.assertEqual(list(differ.diff_tables(self.a, self.a)), [])
+        query_count.assert_not_called()
+
+
+@test_each_database
+class TestChunkSize(HalfMissingTestCase):
+    def test_chunk_size(self):
+        differ = HashDiffer(bisection_factor=2, bisection_threshold=10, chunk_size=10)
+        diff_res = differ.diff_tables(self.a, self.b)
+        self.assertEqual(len(list(diff_res)), 50)
+
+        # The segments are diffed flat, without bisecting them any further
+        segments = diff_res.info_tree.children
+        self.assertGreater(len(segments), 2)
+        self.assertTrue(all(not segment.children for segment in segments))
+
+
+@test_each_database
+class TestBoundariesOnly(DiffTestCase):
+    src_schema = {"id": int, "value": int}
+    dst_schema = {"id": int, "value": int}
+
+    def setUp(self):
+        super().setUp()
+
+        rows = [(i, i) for i in range(100)]
+        rows2 = list(rows)
+        rows2[42] = (42, 0)
+        self.connection.query(
+            [
+                self.src_table.insert_rows(rows),
+                self.dst_table.insert_rows(rows2),
+                commit,
+            ]
+        )
+
+        self.a = TableSegment(self.connection, self.src_table.path, ("id",), extra_columns=("value",))
+        self.b = TableSegment(self.connection, self.dst_table.path, ("id",), extra_columns=("value",))
+
+    def test_boundaries_only(self):
+        differ = HashDiffer(bisection_factor=2, bisection_threshold=10, boundaries_only=True)
+        with unittest.mock.patch.object(TableSegment, "get_values") as get_values:
+            diff_res = differ.diff_tables(self.a, self.b)
+            diff = list(diff_res)
+        get_values.assert_not_called()
+
+        self.assertEqual(len(diff), 1)
+        sign, (min_key, max_key) = diff[0]
+        self.assertEqual(sign, "~")
+        self.assertTrue(min_key[0] <= 42 < max_key[0])
+        self.assertEqual(diff_res.get_stats_dict()["ranges"], 1)
+
+    def test_boundaries_only_no_diff(self):
+        differ = HashDiffer(bisection_factor=2, bisection_threshold=1000, boundaries_only=True)
+        self.assertEqual(list(differ.diff_tables(self.a, self.a)), [])
+        self.assertEqual(len(list(differ.diff_tables(self.a, self.b))), 1)
+
+    def test_stop_at_top_level(self):
+        differ = HashDiffer(bisection_factor=2, bisection_threshold=10, stop_at_top_level=True)
+        with unittest.mock.patch.object(TableSegment, "get_values") as get_values:
+            diff = list(differ.diff_tables(self.a, self.b))
+        get_values.assert_not_called()
+
+        self.assertEqual(len(diff), 1)
+        self.assertEqual(diff[0][0], "~")
+        self.assertEqual(list(differ.diff_tables(self.a, self.a)), [])
+
+        self.assertTrue(differ.diff_tables(self.a, self.b).any_diff())
+        self.assertFalse(differ.diff_tables(self.a, self.a).any_diff())
+
+    def test_close_stops_diffing(self):
+        differ = HashDiffer(bisection_factor=2, bisection_threshold=10)
+        with unittest.mock.patch.object(
+            ThreadedYielder, "stop", autospec=True, side_effect=ThreadedYielder.stop
+        ) as stop:
+            diff_res = differ.diff_tables(self.a, self.b)
+            self.assertTrue(diff_res.any_diff())
+            stop.assert_called_once()
+            ti = stop.call_args[0][0]
+            self.assertTrue(ti.stop_event.is_set())
+
+            stop.reset_mock()
+            diff_res = differ.diff_tables(self.a, self.b)
+            self.assertEqual(len(list(islice(diff_res, 1))), 1)
+            diff_res.close()
+            stop.assert_called_once()
+
+            # Closing a diff that was consumed to the end changes nothing
+            stop.reset_mock()
+            diff_res = differ.diff_tables(self.a, self.b)
+            self.assertEqual(len(list(diff_res)), 2)
+            diff_res.close()
+            stop.assert_not_called()
+            self.assertEqual(diff_res.get_stats_dict()["rows_A"], 100)
+
+    def test_stop_at_top_level_below_threshold(self):
+        # The whole table is below the threshold, but the difference is still reported as a key range
+        differ = HashDiffer(bisection_factor=2, bisection_threshold=1000, stop_at_top_level=True)
+        with unittest.mock.patch.object(TableSegment, "get_values") as get_values:
+            diff_res = differ.diff_tables(self.a, self.b)
+            diff = list(diff_res)
+        get_values.assert_not_called()
+        self.assertEqual([sign for sign, _ in diff], ["~"])
+        self.assertIsNone(diff_res.get_stats_dict()["rows_A"])
+
+
+@test_each_database
+class TestJsonColumns(DiffTestCase):
+    src_schema = {"id": int, "value": int, "other": int}
+    dst_schema = {"id": int, "value": int, "other": int}
+
+    def setUp(self):
+        super().setUp()
+
+        rows = [(i, i, i) for i in range(10)]
+        self.connection.query([self.src_table.insert_rows(rows), self.dst_table.insert_rows(rows[1:]), commit])
+
+    def _segments(self, extra_column: str, is_json: bool):
+        segments = []
+        for path in (self.src_table.path, self.dst_table.path):
+            segment = TableSegment(self.connection, path, ("id",), extra_columns=(extra_column,)).with_schema()
+            if is_json:
+                segment = segment.new(schema=CaseSensitiveDict({**segment._schema, extra_column: JSON()}))
+            segments.append(segment)
+        return segments
+
+    def test_found_once_per_diff(self):
+        differ = HashDiffer(bisection_factor=2, bisection_threshold=3)
+        a, b = self._segments("value", is_json=False)
+        with unittest.mock.patch.object(
+            TableSegment, "_find_json_columns", autospec=True, side_effect=TableSegment._find_json_columns
+        ) as find_json_columns:
+            diff_res = differ.diff_tables(a, b)
+            self.assertEqual(len(list(diff_res)), 1)
+
+        # The diff went down several levels of bisection, and reused the JSON columns of the root
+        def depth(node: InfoTree) -> int:
+            return 1 + max((depth(child) for child in node.children), default=0)
+
+        self.assertGreater(depth(diff_res.info_tree), 2)
+        find_json_columns.assert_called_once()
+
+    def test_concurrent_diffs(self):
+        # Both diffs are started on the same differ before either of them reaches its leaves
+        differ = HashDiffer(bisection_factor=2, bisection_threshold=1000, threaded=False)
+        roots_started = threading.Event()
+
+        def get_values(segment):
+            roots_started.wait(10)
+            return []
+
+        json_cols_by_column = {}
+
+        def diff_sets(rows1, rows2, *, json_cols: dict, columns1, **kwargs):
+            json_cols_by_column[columns1[-1]] = json_cols
+            return iter([])
+
+        with unittest.mock.patch.object(TableSegment, "get_values", get_values), unittest.mock.patch(
+            "data_diff.hashdiff_tables.diff_sets", diff_sets
+        ):
+            diffs = []
+            for extra_column, is_json in (("value", True), ("other", False)):
+                a, b = self._segments(extra_column, is_json)
+                diffs.append(differ._diff_tables_root(a, b, InfoTree(SegmentInfo([a, b]))))
+            roots_started.set()
+            for diff in diffs:
+                list(diff)
+
+        self.assertEqual(json_cols_by_column, {"value": {0: "value"}, "other": {}})
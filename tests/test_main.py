@@ -1,10 +1,21 @@
+import json
+import re
 import unittest
+import unittest.mock
 
 from data_diff import Database, JoinDiffer, HashDiffer
 from data_diff import databases as db
-from data_diff.__main__ import _get_dbs, _set_age, _get_table_differ, _get_expanded_columns, _get_threads
+from data_diff.__main__ import (
+    _get_dbs,
+    _set_age,
+    _get_table_differ,
+    _get_expanded_columns,
+    _get_threads,
+    _print_result,
+)
 from data_diff.databases.mysql import MySQL
 from data_diff.diff_tables import TableDiffer
+from data_diff.utils import ArithUUID, Vector
 from tests.common import CONN_STRINGS, get_conn, DiffTestCase
 
 
@@ -247,3 +258,16 @@ class TestGetThreads(unittest.TestCase):
         with self.assertRaises(ValueError) as value_error:
             _get_threads(-1, None, None)
         assert str(value_error.exception) == "Error: threads must be >= 1"
+
+
+class TestPrintResult(unittest.TestCase):
+    def test__print_result_key_ranges_json(self):
+        key1 = ArithUUID("00000000-0000-0000-0000-000000000001")
+        key2 = ArithUUID("00000000-0000-0000-0000-000000000002")
+        diff = [("~", (Vector((key1,)), Vector((key2,)))), ("-", ("3", "a"))]
+
+        with unittest.mock.patch("rich.print") as rich_print:
+            _print_result(False, True, iter(diff))
+        # Each line is wrapped in rich color markup: [color]...[/color]
+        lines = [json.loads(re.sub(r"^\[[^]]+\]|\[/[^]]+\]$", "", args[0])) for args, _kw in rich_print.call_args_list]
+        assert lines == [["~", [[str(key1.uuid)], [str(key2.uuid)]]], ["-", ["3", "a"]]]
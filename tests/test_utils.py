@@ -1,4 +1,5 @@
 import unittest
+import unittest.mock
 import re
 
 from data_diff.utils import (
@@ -11,6 +12,7 @@ from data_diff.utils import (
     columns_removed_template,
     columns_added_template,
     columns_type_changed_template,
+    diffs_are_equiv_jsons,
 )
 
 from data_diff.__main__ import _remove_passwords_in_dict
@@ -137,6 +139,24 @@ class TestUtils(unittest.TestCase):
         assert number_to_human(-1000000000) == "-1b"
 
 
+class TestDiffsAreEquivJsons(unittest.TestCase):
+    json_cols = {1: "data"}
+
+    def test_equivalent_jsons(self):
+        diff = [("-", ("1", "a", '{"x": 1, "y": 2}')), ("+", ("1", "a", '{"y": 2, "x": 1}'))]
+        self.assertEqual(diffs_are_equiv_jsons(diff, self.json_cols), (True, {"data"}))
+
+    def test_different_jsons(self):
+        diff = [("-", ("1", "a", '{"x": 1}')), ("+", ("1", "a", '{"x": 2}'))]
+        self.assertFalse(diffs_are_equiv_jsons(diff, self.json_cols)[0])
+
+    def test_non_json_column_differs(self):
+        diff = [("-", ("1", "a", '{"x": 1, "y": 2}')), ("+", ("1", "b", '{"y": 2, "x": 1}'))]
+        with unittest.mock.patch("data_diff.utils._jsons_equiv") as jsons_equiv:
+            self.assertFalse(diffs_are_equiv_jsons(diff, self.json_cols)[0])
+        jsons_equiv.assert_not_called()
+
+
 class TestDiffIntDynamicColorTemplate(unittest.TestCase):
     def test_string_input(self):
         self.assertEqual(diff_int_dynamic_color_template("test_string"), "test_string")